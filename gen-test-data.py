@@ -1,8 +1,23 @@
 #!/usr/bin/env python3
 
 if __name__ == '__main__':
+    import argparse
     import json
-    from random import randint
-    n = 10000
-    out = [randint(0, n) for _ in range(0, n)]
+    import os
+    import random
+    import sys
+    # Allow running from a checkout without installing the package
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+    from scl.bench.workloads import WORKLOADS, make_clustered, make_workload
+    parser = argparse.ArgumentParser(description='Generate a workload of random integers for the benchmarks')
+    parser.add_argument('-n', type=int, default=10000, help='the number of values to generate')
+    parser.add_argument('--kind', choices=list(WORKLOADS), default='random')
+    parser.add_argument('--seed', type=int, help='seed the random number generator for reproducible output')
+    parser.add_argument('--cluster-size', type=int, default=64)
+    args = parser.parse_args()
+    seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+    if args.kind == 'clustered':
+        out = make_clustered(args.n, seed, args.cluster_size)
+    else:
+        out = make_workload(args.kind, args.n, seed)
     print(json.dumps(out))
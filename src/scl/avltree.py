@@ -1,12 +1,15 @@
 
-from typing import Any, TypeIs
+from collections.abc import Callable
+from typing import Any, TypeIs, cast, overload
 
-from scl.binarytree import K, BinaryNode, BinaryTree
+from scl.binarytree import K, BinaryNode, BinaryTree, _is_binary_node
 from scl.util import T, nonnull
 
 
 class AVLNode(BinaryNode[T]):
 
+    __slots__ = ('balance',)
+
     def __init__(self, value: T) -> None:
         super().__init__(value)
         self.balance = 0
@@ -16,7 +19,48 @@ def _is_avl_node(value: Any) -> TypeIs[AVLNode]:
     return True
 
 
+class SizedAVLNode(AVLNode[T]):
+    """
+    An AVL node that also stores the number of nodes in its subtree.
+    """
+
+    __slots__ = ('size',)
+
+    def __init__(self, value: T) -> None:
+        super().__init__(value)
+        self.size = 1
+
+    def update_size(self) -> None:
+        size = 1
+        if self.left is not None:
+            size += cast(SizedAVLNode, self.left).size
+        if self.right is not None:
+            size += cast(SizedAVLNode, self.right).size
+        self.size = size
+
+
+def _size(node: BinaryNode | None) -> int:
+    return cast(SizedAVLNode, node).size if node is not None else 0
+
+
 class AVLTree(BinaryTree[T, K]):
+    """
+    A self-balancing binary search tree.
+
+    When `order_statistics` is enabled, every node additionally keeps the
+    size of its subtree so that values can be looked up by their position
+    with `select`, `rank`, `count_range` and indexing in O(log n).
+    """
+
+    def __init__(self, key: str | Callable[[T], K] | None = None, order_statistics: bool = False) -> None:
+        super().__init__(key)
+        self._order_statistics = order_statistics
+
+    def update_path(self, node: BinaryNode[T] | None) -> None:
+        if self._order_statistics:
+            while node is not None:
+                cast(SizedAVLNode, node).update_size()
+                node = node.parent
 
     def rotate_left(self, node: BinaryNode[T]) -> BinaryNode[T]:
         right = nonnull(node.right)
@@ -28,7 +72,11 @@ class AVLTree(BinaryTree[T, K]):
         else:
             node.balance = 0
             right.balance = 0
-        return super().rotate_left(node)
+        super().rotate_left(node)
+        if self._order_statistics:
+            cast(SizedAVLNode, node).update_size()
+            cast(SizedAVLNode, right).update_size()
+        return right
 
     def rotate_right(self, node: BinaryNode[T]) -> BinaryNode[T]:
         left = nonnull(node.left)
@@ -40,11 +88,15 @@ class AVLTree(BinaryTree[T, K]):
         else:
             left.balance = 0
             node.balance = 0
-        return super().rotate_right(node)
+        super().rotate_right(node)
+        if self._order_statistics:
+            cast(SizedAVLNode, node).update_size()
+            cast(SizedAVLNode, left).update_size()
+        return left
 
     def rotate_right_then_left(self, x: BinaryNode[T]) -> BinaryNode[T]:
-        z = nonnull(x.left)
-        y = nonnull(z.right)
+        z = nonnull(x.right)
+        y = nonnull(z.left)
         assert(_is_avl_node(x))
         assert(_is_avl_node(y))
         assert(_is_avl_node(z))
@@ -58,7 +110,12 @@ class AVLTree(BinaryTree[T, K]):
             x.balance = 0
             z.balance = +1
         y.balance = 0
-        return super().rotate_right_then_left(x)
+        super().rotate_right_then_left(x)
+        if self._order_statistics:
+            cast(SizedAVLNode, x).update_size()
+            cast(SizedAVLNode, z).update_size()
+            cast(SizedAVLNode, y).update_size()
+        return y
 
     def rotate_left_then_right(self, x: BinaryNode[T]) -> BinaryNode[T]:
         z = nonnull(x.left)
@@ -76,10 +133,16 @@ class AVLTree(BinaryTree[T, K]):
             x.balance = 0
             z.balance = -1
         y.balance = 0
-        return super().rotate_left_then_right(x)
+        super().rotate_left_then_right(x)
+        if self._order_statistics:
+            cast(SizedAVLNode, z).update_size()
+            cast(SizedAVLNode, x).update_size()
+            cast(SizedAVLNode, y).update_size()
+        return y
 
     def add_node(self, node: BinaryNode[T], /, hint: Any = None) -> None:
         assert(_is_avl_node(node))
+        node.balance = 0
         super().add_node(node, hint)
         parent = node.parent
         while parent is not None:
@@ -112,6 +175,148 @@ class AVLTree(BinaryTree[T, K]):
                     node = parent
             parent = node.parent
 
+    def remove_node(self, node: BinaryNode[T]) -> tuple[BinaryNode[T] | None, bool]:
+        assert(_is_avl_node(node))
+        if node.left is not None and node.right is not None:
+            # The successor will take over the position of `node` in the tree
+            successor = nonnull(node.right.get_leftmost())
+            assert(_is_avl_node(successor))
+            successor.balance = node.balance
+        result = super().remove_node(node)
+        parent, is_left = result
+        while parent is not None:
+            assert(_is_avl_node(parent))
+            if is_left:
+                if parent.balance < 0:
+                    parent.balance = 0
+                elif parent.balance == 0:
+                    parent.balance = +1
+                    break
+                else:
+                    sibling = nonnull(parent.right)
+                    assert(_is_avl_node(sibling))
+                    if sibling.balance < 0:
+                        parent = self.rotate_right_then_left(parent)
+                    else:
+                        balanced = sibling.balance == 0
+                        parent = self.rotate_left(parent)
+                        if balanced:
+                            break
+            else:
+                if parent.balance > 0:
+                    parent.balance = 0
+                elif parent.balance == 0:
+                    parent.balance = -1
+                    break
+                else:
+                    sibling = nonnull(parent.left)
+                    assert(_is_avl_node(sibling))
+                    if sibling.balance > 0:
+                        parent = self.rotate_left_then_right(parent)
+                    else:
+                        balanced = sibling.balance == 0
+                        parent = self.rotate_right(parent)
+                        if balanced:
+                            break
+            node = parent
+            parent = node.parent
+            if parent is not None:
+                assert(_is_binary_node(parent))
+                is_left = parent.left == node
+        return result
+
+    def create_node(self, value: T) -> BinaryNode[T]:
+        return SizedAVLNode(value) if self._order_statistics else AVLNode(value)
+
+    def update_built_node(self, node: BinaryNode[T], left_height: int, right_height: int) -> None:
+        assert(_is_avl_node(node))
+        node.balance = right_height - left_height
+        if self._order_statistics:
+            cast(SizedAVLNode, node).update_size()
+
     def add(self, value: T, /, hint: Any = None) -> None:
-        node = AVLNode(value)
+        node = self.create_node(value)
         return self.add_node(node, hint)
+
+    def _check_order_statistics(self) -> None:
+        if not self._order_statistics:
+            raise TypeError('this tree was created without order_statistics=True')
+
+    def select_node(self, i: int) -> BinaryNode[T]:
+        """
+        Get the node at position `i` in key order. Negative positions count from the end.
+        """
+        self._check_order_statistics()
+        n = self._count
+        if i < 0:
+            i += n
+        if i < 0 or i >= n:
+            raise IndexError('tree index out of range')
+        node = self._root
+        while True:
+            assert(node is not None)
+            left_size = _size(node.left) # type: ignore
+            if i < left_size:
+                node = node.left # type: ignore
+            elif i == left_size:
+                return node # type: ignore
+            else:
+                i -= left_size + 1
+                node = node.right # type: ignore
+
+    def select(self, i: int) -> T:
+        """
+        Get the value at position `i` in key order. Negative positions count from the end.
+        """
+        return self.select_node(i).value
+
+    def _rank(self, key: K, inclusive: bool) -> int:
+        self._check_order_statistics()
+        get_key = self._get_key
+        node = self._root
+        result = 0
+        while node is not None:
+            assert(_is_binary_node(node))
+            node_key = get_key(node.value)
+            if node_key < key or (inclusive and node_key == key):
+                result += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return result
+
+    def rank(self, key: K) -> int:
+        """
+        Count the values whose key is strictly smaller than `key`.
+
+        This is also the position at which a value with this key would be inserted.
+        """
+        return self._rank(key, False)
+
+    def count_range(self, lo: K, hi: K, inclusive: tuple[bool, bool] = (True, True)) -> int:
+        """
+        Count the values whose key lies between `lo` and `hi` without visiting them.
+        """
+        count = self._rank(hi, inclusive[1]) - self._rank(lo, not inclusive[0])
+        return count if count > 0 else 0
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, int):
+            return self.select(index)
+        start, stop, step = index.indices(self._count)
+        if start >= stop if step > 0 else start <= stop:
+            self._check_order_statistics()
+            return []
+        if step == 1:
+            result = list[T]()
+            node = self.select_node(start)
+            for _ in range(start, stop):
+                assert(node is not None)
+                result.append(node.value)
+                node = node.next
+            return result
+        return [ self.select(i) for i in range(start, stop, step) ]
@@ -0,0 +1,34 @@
+"""
+Standalone benchmarks for the collections in this library.
+
+Every module in this package can be run on its own, e.g.
+
+```
+python3 -m scl.bench.graph
+```
+
+Running the package itself runs every benchmark on the workloads from
+`scl.bench.workloads` and writes the results as JSON, see `scl.bench.__main__`.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any, TextIO
+
+
+def measure(fn: Callable[[], Any], /, repeat: int = 3) -> float:
+    """
+    Run `fn` `repeat` times and return the fastest wall-clock time in seconds.
+    """
+    best = float('inf')
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if elapsed < best:
+            best = elapsed
+    return best
+
+
+def report(name: str, n: int, seconds: float, file: TextIO | None = None) -> None:
+    print(f'{name:<40} n={n:<10} {seconds * 1000:10.2f} ms  {seconds / max(n, 1) * 1e9:10.1f} ns/op', file=file)
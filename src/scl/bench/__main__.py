@@ -0,0 +1,245 @@
+"""
+Run the benchmark suite over every collection and write the results as JSON.
+
+```
+python3 -m scl.bench --sizes 1000 10000 --output results.json
+python3 -m scl.bench --data data.json --compare results.json
+```
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import sys
+from collections.abc import Callable, Iterator
+from typing import Any, TextIO
+
+from scl import intervallist, intervaltree
+from scl.avltree import AVLTree
+from scl.graph import Graph, strongconnect, toposort
+from scl.util import binary_search, binary_search_left, insertionsort, sort_inserted, sort_inserted_many
+
+from . import measure, report
+from .memory import bytes_per_element
+from .workloads import WORKLOADS, load_workload, make_workload
+
+
+# The insertion sort helpers are quadratic, so they are only run on a prefix of every workload
+MAX_QUADRATIC_N = 2000
+
+# Every benchmark yields tuples of (name, number of operations, seconds)
+Measurements = Iterator[tuple[str, int, float]]
+
+
+def _queries(values: list[int], count: int) -> list[int]:
+    rng = random.Random(1)
+    return [ rng.randint(0, len(values)) for _ in range(0, count) ]
+
+
+def bench_avltree(values: list[int], queries: list[int], repeat: int) -> Measurements:
+    n = len(values)
+    def build() -> AVLTree[int, int]:
+        t = AVLTree[int, int]()
+        for value in values:
+            t.add(value)
+        return t
+    yield 'avltree/add', n, measure(build, repeat)
+    yield 'avltree/add_many_sorted', n, measure(lambda: AVLTree[int, int]().add_many_sorted(values), repeat)
+    t = build()
+    yield 'avltree/contains', len(queries), measure(lambda: [ q in t for q in queries ], repeat)
+    yield 'avltree/irange', len(queries), measure(lambda: [ sum(1 for _ in t.irange(q, q + 100)) for q in queries ], repeat)
+    yield 'avltree/iter', n, measure(lambda: sum(1 for _ in t), repeat)
+
+
+def _intervals(values: list[int]) -> list[tuple[int, int]]:
+    rng = random.Random(2)
+    return [ (value, value + rng.randrange(1, 100)) for value in values ]
+
+
+def bench_intervaltree(values: list[int], queries: list[int], repeat: int) -> Measurements:
+    bounds = _intervals(values)
+    n = len(bounds)
+    def build() -> intervaltree.IntervalTree[int]:
+        t = intervaltree.IntervalTree[int]()
+        for start, stop in bounds:
+            t.addi(start, stop)
+        return t
+    yield 'intervaltree/add', n, measure(build, repeat)
+    t = build()
+    ranges = [ intervaltree.Interval(q, q + 10) for q in queries ]
+    yield 'intervaltree/overlapping', len(queries), measure(lambda: [ list(t.overlapping(r)) for r in ranges ], repeat)
+    yield 'intervaltree/overlap_point', len(queries), measure(lambda: [ list(t.overlap_point(q)) for q in queries ], repeat)
+    yield 'intervaltree/iter', n, measure(lambda: sum(1 for _ in t), repeat)
+
+
+def bench_intervallist(values: list[int], queries: list[int], repeat: int) -> Measurements:
+    bounds = _intervals(values)
+    n = len(bounds)
+    def build() -> intervallist.IntervalList[int]:
+        l = intervallist.IntervalList[int]()
+        for start, stop in bounds:
+            l.add(intervallist.Interval(start, stop))
+        return l
+    yield 'intervallist/add', n, measure(build, repeat)
+    l = build()
+    yield 'intervallist/overlap_point', len(queries), measure(lambda: [ l.overlap_point(q) for q in queries ], repeat)
+    yield 'intervallist/iter', n, measure(lambda: sum(1 for _ in l), repeat)
+
+
+def bench_graph(values: list[int], queries: list[int], repeat: int) -> Measurements:
+    n = len(values)
+    def build() -> Graph[int]:
+        g = Graph[int]()
+        for i, value in enumerate(values):
+            g.add_edge(i, value)
+        return g
+    yield 'graph/add_edge', n, measure(build, repeat)
+    g = build()
+    yield 'graph/has_edge', len(queries), measure(lambda: [ g.has_edge(q, q) for q in queries ], repeat)
+    yield 'graph/strongconnect', n, measure(lambda: sum(1 for _ in strongconnect(g)), repeat)
+    dag = Graph[int]()
+    for i, value in enumerate(values):
+        # Only keep the edges that point forward so that the graph is acyclic
+        if i < value:
+            dag.add_edge(i, value)
+        else:
+            dag.add_vertex(i)
+    yield 'graph/toposort', n, measure(lambda: toposort(dag), repeat)
+
+
+def bench_util(values: list[int], queries: list[int], repeat: int) -> Measurements:
+    ordered = sorted(values)
+    yield 'util/binary_search_left', len(queries), measure(lambda: [ binary_search_left(ordered, q) for q in queries ], repeat)
+    yield 'util/binary_search', len(queries), measure(lambda: [ binary_search(ordered, q) for q in queries ], repeat)
+    prefix = values[:MAX_QUADRATIC_N]
+    def sort_all_inserted() -> None:
+        elements = list[int]()
+        for value in prefix:
+            elements.append(value)
+            sort_inserted(elements, len(elements) - 1)
+    yield 'util/sort_inserted', len(prefix), measure(sort_all_inserted, repeat)
+    yield 'util/insertionsort', len(prefix), measure(lambda: insertionsort(list(prefix)), repeat)
+    def sort_all_inserted_many(batch_size: int = 100) -> None:
+        elements = list[int]()
+        for i in range(0, len(values), batch_size):
+            start = len(elements)
+            elements.extend(values[i:i+batch_size])
+            sort_inserted_many(elements, start)
+    yield 'util/sort_inserted_many', len(values), measure(sort_all_inserted_many, repeat)
+
+
+BENCHMARKS: dict[str, Callable[[list[int], list[int], int], Measurements]] = {
+    'avltree': bench_avltree,
+    'intervaltree': bench_intervaltree,
+    'intervallist': bench_intervallist,
+    'graph': bench_graph,
+    'util': bench_util,
+}
+
+
+def bench_memory(values: list[int]) -> Iterator[tuple[str, float]]:
+    n = len(values)
+    bounds = _intervals(values)
+    for name, build in [
+        ('avltree', lambda: AVLTree.from_iterable(values)),
+        ('intervaltree', lambda: intervaltree.IntervalTree(intervaltree.Interval(start, stop) for start, stop in bounds)),
+        ('intervallist', lambda: intervallist.IntervalList(intervallist.Interval(start, stop) for start, stop in bounds)),
+    ]:
+        yield f'{name}/memory', bytes_per_element(build, n)
+
+
+def run(workloads: list[tuple[str, list[int]]], benchmarks: list[str], queries: int, repeat: int, memory: bool, file: TextIO | None = None) -> list[dict[str, Any]]:
+    """
+    Run `benchmarks` on every workload and return the results.
+
+    Progress is printed to `file` as every measurement completes.
+    """
+    results = list[dict[str, Any]]()
+    for workload, values in workloads:
+        n = len(values)
+        needles = _queries(values, queries)
+        for benchmark in benchmarks:
+            for name, ops, seconds in BENCHMARKS[benchmark](values, needles, repeat):
+                report(f'{name}/{workload}', ops, seconds, file)
+                results.append({
+                    'name': name,
+                    'workload': workload,
+                    'n': n,
+                    'ops': ops,
+                    'seconds': seconds,
+                    'ns_per_op': seconds / max(ops, 1) * 1e9,
+                })
+        if memory:
+            for name, size in bench_memory(values):
+                print(f'{name + "/" + workload:<40} n={n:<10} {size:8.1f} B/element', file=file)
+                results.append({
+                    'name': name,
+                    'workload': workload,
+                    'n': n,
+                    'bytes_per_element': size,
+                })
+    return results
+
+
+def compare(old: dict[str, Any], new: dict[str, Any], file: TextIO | None = None) -> None:
+    """
+    Print to `file` how much slower or faster every benchmark in `new` is compared to `old`.
+    """
+    def index(results: list[dict[str, Any]]) -> dict[tuple[str, str, int], dict[str, Any]]:
+        return { (result['name'], result['workload'], result['n']): result for result in results }
+    old_results = index(old['results'])
+    for key, result in index(new['results']).items():
+        old_result = old_results.get(key)
+        if old_result is None:
+            continue
+        field = 'seconds' if 'seconds' in result else 'bytes_per_element'
+        ratio = result[field] / old_result[field] if old_result[field] else float('inf')
+        name, workload, n = key
+        print(f'{name + "/" + workload:<40} n={n:<10} {ratio:6.2f}x', file=file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run all benchmarks and write the results as JSON')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[ 1_000, 10_000 ])
+    parser.add_argument('--workloads', nargs='+', choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument('--data', action='append', default=[], help='also run on a workload file written by gen-test-data.py')
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--queries', type=int, default=1_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='skip measuring memory usage')
+    parser.add_argument('--output', help='write the results to this file instead of standard output')
+    parser.add_argument('--compare', help='compare the results against an earlier output file')
+    args = parser.parse_args()
+
+    workloads = list[tuple[str, list[int]]]()
+    for kind in args.workloads:
+        for n in args.sizes:
+            workloads.append((kind, make_workload(kind, n)))
+    for path in args.data:
+        workloads.append((path, load_workload(path)))
+
+    # Human-readable progress goes to stderr when the JSON is written to stdout
+    progress = sys.stderr if args.output is None else None
+    results = run(workloads, args.benchmarks, args.queries, args.repeat, args.memory, progress)
+    output = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.compare is not None:
+        with open(args.compare) as f:
+            compare(json.load(f), output, progress)
+    if args.output is None:
+        json.dump(output, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+
+import argparse
+import random
+import tracemalloc
+
+from scl.graph import Graph, condensation, strongconnect, toposort
+
+from . import measure, report
+
+
+def make_chain(n: int) -> Graph[int]:
+    g = Graph[int]()
+    for i in range(0, n-1):
+        g.add_edge(i, i+1)
+    return g
+
+
+def make_cycle(n: int) -> Graph[int]:
+    g = make_chain(n)
+    g.add_edge(n-1, 0)
+    return g
+
+
+def make_random(n: int, degree: int = 4, seed: int = 0) -> Graph[int]:
+    rng = random.Random(seed)
+    g = Graph[int]()
+    for v in range(0, n):
+        g.add_vertex(v)
+        for _ in range(0, degree):
+            g.add_edge(v, rng.randrange(n))
+    return g
+
+
+def bench_strongconnect(sizes: list[int], repeat: int) -> None:
+    for n in sizes:
+        for name, make in [ ('chain', make_chain), ('cycle', make_cycle), ('random', make_random) ]:
+            g = make(n)
+            seconds = measure(lambda: sum(1 for _ in strongconnect(g)), repeat)
+            report(f'strongconnect/{name}', n, seconds)
+            f = g.freeze()
+            seconds = measure(lambda: sum(1 for _ in strongconnect(f)), repeat)
+            report(f'strongconnect/{name}/frozen', n, seconds)
+
+
+def make_dag(n: int, degree: int = 4, seed: int = 0) -> Graph[int]:
+    rng = random.Random(seed)
+    g = Graph[int]()
+    for v in range(0, n):
+        g.add_vertex(v)
+        for _ in range(0, degree if v > 0 else 0):
+            g.add_edge(rng.randrange(v), v)
+    return g
+
+
+def bench_toposort(sizes: list[int], repeat: int) -> None:
+    for n in sizes:
+        g = make_dag(n)
+        report('toposort/dag', n, measure(lambda: toposort(g), repeat))
+        f = g.freeze()
+        report('toposort/dag/frozen', n, measure(lambda: toposort(f), repeat))
+        g = make_random(n)
+        report('condensation/random', n, measure(lambda: condensation(g), repeat))
+
+
+def bench_freeze_memory(sizes: list[int]) -> None:
+    for n in sizes:
+        tracemalloc.start()
+        g = make_random(n)
+        graph_bytes = tracemalloc.get_traced_memory()[0]
+        f = g.freeze()
+        frozen_bytes = tracemalloc.get_traced_memory()[0] - graph_bytes
+        tracemalloc.stop()
+        edges = g.count_edges()
+        print(f'{"memory/random":<40} n={n:<10} Graph {graph_bytes / edges:8.1f} B/edge  FrozenGraph {frozen_bytes / edges:8.1f} B/edge')
+        del f
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark graph algorithms')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[ 100_000, 1_000_000 ])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    bench_strongconnect(args.sizes, args.repeat)
+    bench_toposort(args.sizes, args.repeat)
+    bench_freeze_memory(args.sizes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+
+import argparse
+import random
+
+from scl.intervalarray import IntervalArray
+from scl.intervaltree import Interval, IntervalTree
+
+from . import measure, report
+
+
+def bench_static(sizes: list[int], queries: int, repeat: int) -> None:
+    rng = random.Random(0)
+    for n in sizes:
+        intervals = list[Interval[int]]()
+        for _ in range(0, n):
+            start = rng.randrange(0, n)
+            intervals.append(Interval(start, start + rng.randrange(0, 100)))
+        report('intervalarray/build', n, measure(lambda: IntervalArray(intervals), repeat))
+        a = IntervalArray(intervals)
+        t = IntervalTree(intervals)
+        points = [ rng.randrange(0, n) for _ in range(0, queries) ]
+        report('intervaltree/stab_many', queries, measure(lambda: t.stab_many(points), repeat))
+        report('intervalarray/stab_many', queries, measure(lambda: a.stab_many(points), repeat))
+        report('intervalarray/query', queries, measure(lambda: a.query(points, points), repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the array-backed interval index')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[ 10_000, 100_000, 1_000_000 ])
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+    bench_static(args.sizes, args.queries, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
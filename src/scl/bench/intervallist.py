@@ -0,0 +1,39 @@
+
+import argparse
+import random
+
+from scl import intervallist, intervaltree
+
+from . import measure, report
+
+
+def bench_crossover(sizes: list[int], queries: int, repeat: int) -> None:
+    """
+    Compare point stabbing on `IntervalList` with `IntervalTree` to find out
+    from which size onwards the tree is the faster choice.
+    """
+    rng = random.Random(0)
+    for n in sizes:
+        bounds = sorted((start, start + rng.randrange(1, 100)) for start in (rng.randrange(0, n) for _ in range(0, n)))
+        l = intervallist.IntervalList(intervallist.Interval(start, stop) for start, stop in bounds)
+        t = intervaltree.IntervalTree(intervaltree.Interval(start, stop) for start, stop in bounds)
+        points = [ rng.randrange(0, n) for _ in range(0, queries) ]
+        list_time = measure(lambda: [ l.overlap_point(p) for p in points ], repeat)
+        tree_time = measure(lambda: [ set(t.overlap_point(p)) for p in points ], repeat)
+        report(f'intervallist/overlap_point/n={n}', queries, list_time)
+        report(f'intervaltree/overlap_point/n={n}', queries, tree_time)
+        within_time = measure(lambda: [ intervallist.Interval(p, p + 10) in l for p in points ], repeat)
+        report(f'intervallist/within/n={n}', queries, within_time)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark interval lists against interval trees')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[ 16, 128, 1024, 8192, 65536 ])
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    bench_crossover(args.sizes, args.queries, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+
+import argparse
+import math
+import random
+
+from scl.intervaltree import Interval, IntervalTree
+
+from . import measure, report
+
+
+def height(t: IntervalTree) -> int:
+    result = 0
+    stack = [ (t._root, 1) ] if t._root is not None else []
+    while stack:
+        node, depth = stack.pop()
+        if depth > result:
+            result = depth
+        if node.left is not None:
+            stack.append((node.left, depth + 1))
+        if node.right is not None:
+            stack.append((node.right, depth + 1))
+    return result
+
+
+def bench_monotone(sizes: list[int], queries: int, repeat: int) -> None:
+    rng = random.Random(0)
+    for n in sizes:
+        intervals = [ Interval(i, i + 10) for i in range(0, n) ]
+        def build() -> IntervalTree[int]:
+            t = IntervalTree[int]()
+            for interval in intervals:
+                t.add(interval)
+            return t
+        report('intervaltree/add/monotone', n, measure(build, repeat))
+        report('intervaltree/from_sorted/monotone', n, measure(lambda: IntervalTree.from_sorted(intervals), repeat))
+        shuffled = list(intervals)
+        rng.shuffle(shuffled)
+        report('intervaltree/constructor/random', n, measure(lambda: IntervalTree(shuffled), repeat))
+        t = build()
+        print(f'{"intervaltree/height/monotone":<40} n={n:<10} {height(t):10} levels  (log2 n = {math.log2(n):.1f})')
+        points = [ rng.randrange(0, n) for _ in range(0, queries) ]
+        def stab() -> None:
+            for p in points:
+                for _ in t.overlapping(Interval(p, p)):
+                    pass
+        report('intervaltree/stab/monotone', queries, measure(stab, repeat))
+
+
+def bench_batched(sizes: list[int], queries: int, repeat: int) -> None:
+    rng = random.Random(1)
+    for n in sizes:
+        intervals = list[Interval[int]]()
+        for _ in range(0, n):
+            start = rng.randrange(0, n)
+            intervals.append(Interval(start, start + rng.randrange(0, 100)))
+        t = IntervalTree(intervals)
+        points = [ rng.randrange(0, n) for _ in range(0, queries) ]
+        report('intervaltree/overlap_point/loop', queries, measure(lambda: [ list(t.overlap_point(p)) for p in points ], repeat))
+        report('intervaltree/stab_many', queries, measure(lambda: t.stab_many(points), repeat))
+        ranges = [ Interval(p, p + 50) for p in points ]
+        report('intervaltree/overlapping/loop', queries, measure(lambda: [ list(t.overlapping(q)) for q in ranges ], repeat))
+        report('intervaltree/overlapping_many', queries, measure(lambda: t.overlapping_many(ranges), repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark interval trees')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[ 10_000, 100_000, 1_000_000 ])
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+    bench_monotone(args.sizes, args.queries, args.repeat)
+    bench_batched(args.sizes, args.queries, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
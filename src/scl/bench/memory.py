@@ -0,0 +1,47 @@
+
+import argparse
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from scl.avltree import AVLTree
+from scl.intervalarray import IntervalArray
+from scl import intervallist, intervaltree
+
+
+def bytes_per_element(build: Callable[[], Any], n: int) -> float:
+    """
+    Measure how many bytes the structure returned by `build` keeps alive per element.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / n
+
+
+def bench_memory(sizes: list[int]) -> None:
+    for n in sizes:
+        bounds = [ (i, i + 10) for i in range(0, n) ]
+        # Keys are created outside of the measurement so only the structure itself is counted
+        keys = list(range(n, 2 * n))
+        for name, build in [
+            ('AVLTree', lambda: AVLTree.from_sorted(keys)),
+            ('IntervalTree', lambda: intervaltree.IntervalTree.from_sorted([ intervaltree.Interval(start, stop) for start, stop in bounds ])),
+            ('IntervalList', lambda: intervallist.IntervalList([ intervallist.Interval(start, stop) for start, stop in bounds ])),
+            ('IntervalArray', lambda: IntervalArray.from_arrays([ start for start, _ in bounds ], [ stop for _, stop in bounds ])),
+        ]:
+            print(f'{"memory/" + name:<40} n={n:<10} {bytes_per_element(build, n):8.1f} B/element')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measure memory usage per element of each collection')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[ 100_000 ])
+    args = parser.parse_args()
+    bench_memory(args.sizes)
+
+
+if __name__ == '__main__':
+    main()
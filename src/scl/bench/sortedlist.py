@@ -0,0 +1,54 @@
+
+import argparse
+import random
+
+from scl.avltree import AVLTree
+from scl.sortedlist import SortedList
+
+from . import measure, report
+
+
+def bench_sortedlist(sizes: list[int], queries: int, repeat: int) -> None:
+    """
+    Compare `SortedList` with `AVLTree` on inserts, lookups and range scans.
+    """
+    rng = random.Random(0)
+    for n in sizes:
+        values = [ rng.randrange(0, n * 10) for _ in range(0, n) ]
+        needles = [ rng.randrange(0, n * 10) for _ in range(0, queries) ]
+        ranges = [ (lo, lo + 1000) for lo in needles ]
+
+        def fill_tree() -> AVLTree[int, int]:
+            t = AVLTree[int, int]()
+            for value in values:
+                t.add(value)
+            return t
+
+        def fill_list() -> SortedList[int]:
+            l = SortedList[int]()
+            for value in values:
+                l.add(value)
+            return l
+
+        report(f'avltree/add/n={n}', n, measure(fill_tree, repeat))
+        report(f'sortedlist/add/n={n}', n, measure(fill_list, repeat))
+
+        t = AVLTree[int, int].from_iterable(values)
+        l = SortedList(values)
+        report(f'avltree/contains/n={n}', queries, measure(lambda: [ needle in t for needle in needles ], repeat))
+        report(f'sortedlist/contains/n={n}', queries, measure(lambda: [ needle in l for needle in needles ], repeat))
+        report(f'avltree/irange/n={n}', queries, measure(lambda: [ sum(1 for _ in t.irange(lo, hi)) for lo, hi in ranges ], repeat))
+        report(f'sortedlist/irange/n={n}', queries, measure(lambda: [ sum(1 for _ in l.irange(lo, hi)) for lo, hi in ranges ], repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark sorted lists against AVL trees')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[ 10_000, 100_000, 1_000_000 ])
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    bench_sortedlist(args.sizes, args.queries, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Generators for the inputs that the benchmarks are run on.
+
+Every workload is a list of `n` integers between `0` and `n`, like the
+`data.json` file in the root of the repository.
+"""
+
+import json
+import random
+from collections.abc import Callable
+
+
+def make_random(n: int, seed: int = 0) -> list[int]:
+    rng = random.Random(seed)
+    return [ rng.randint(0, n) for _ in range(0, n) ]
+
+
+def make_sorted(n: int, seed: int = 0) -> list[int]:
+    return sorted(make_random(n, seed))
+
+
+def make_reversed(n: int, seed: int = 0) -> list[int]:
+    return sorted(make_random(n, seed), reverse=True)
+
+
+def make_clustered(n: int, seed: int = 0, cluster_size: int = 64) -> list[int]:
+    """
+    Generate runs of `cluster_size` values that lie close to each other,
+    like timestamps that arrive in bursts.
+    """
+    rng = random.Random(seed)
+    out = list[int]()
+    while len(out) < n:
+        center = rng.randint(0, n)
+        for _ in range(0, min(cluster_size, n - len(out))):
+            out.append(min(n, max(0, center + rng.randint(-cluster_size, cluster_size))))
+    return out
+
+
+WORKLOADS: dict[str, Callable[[int, int], list[int]]] = {
+    'random': make_random,
+    'sorted': make_sorted,
+    'reversed': make_reversed,
+    'clustered': make_clustered,
+}
+
+
+def make_workload(kind: str, n: int, seed: int = 0) -> list[int]:
+    """
+    Generate the workload named `kind` with `n` values.
+    """
+    try:
+        make = WORKLOADS[kind]
+    except KeyError:
+        raise ValueError(f'unknown workload {kind!r}, expected one of {", ".join(WORKLOADS)}') from None
+    return make(n, seed)
+
+
+def load_workload(path: str) -> list[int]:
+    """
+    Read a workload that was written by `gen-test-data.py`.
+    """
+    with open(path) as f:
+        return json.load(f)
@@ -1,11 +1,10 @@
 
 from abc import abstractmethod
-from collections.abc import Callable, Iterator
-from typing import Any, Generic, TypeIs, TypeVar
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any, Generic, Self, TypeIs, TypeVar, cast
 
-from .util import Comparable
+from .util import Comparable, lift_key, nonnull
 from .tree import T, Node, Tree
-from .intervaltree import nonnull
 
 
 K = TypeVar('K', bound=Comparable)
@@ -13,6 +12,8 @@ K = TypeVar('K', bound=Comparable)
 
 class BinaryNode(Node[T]):
 
+    __slots__ = ('left', 'right')
+
     def __init__(self, value: T) -> None:
         super().__init__(value)
         self.left: BinaryNode[T] | None = None
@@ -59,34 +60,103 @@ def _is_binary_node(value: Any) -> TypeIs[BinaryNode]:
     return True
 
 
+def _is_optional_binary_node(value: Any) -> TypeIs[BinaryNode | None]:
+    return True
+
+
 class BinaryTree(Tree[T], Generic[T, K]):
 
     def __init__(self, key: str | Callable[[T], K] | None = None) -> None:
         super().__init__()
-        if key is None:
-            get_key = lambda value: value
-        elif isinstance(key, str):
-            name = key
-            get_key = lambda value: getattr(value, name)
-        else:
-            get_key = key
-        self._get_key = get_key
+        self._get_key = lift_key(key)
         self._count = 0
+        # The node that was inserted last, or a node close to the one that
+        # was removed last. Only operations that modify the tree move it.
+        self._finger: BinaryNode[T] | None = None
+        # The nodes with the smallest and the largest key, so that values
+        # can be attached to either end of the tree without climbing
+        self._leftmost: BinaryNode[T] | None = None
+        self._rightmost: BinaryNode[T] | None = None
+
+    def _climb_from_finger(self, key: K) -> BinaryNode[T] | None:
+        """
+        Get the node below the finger, or the ancestor of the finger, from
+        which a descent to the place where a value with key `key` belongs
+        should start.
 
-    def get_add_hint(self, value: T) -> Any:
-        key = self._get_key(value)
-        node = self._root
-        assert(_is_binary_node(node))
+        Only ancestors at which the path turns towards `key` have to be
+        compared, so climbing along the spine of the tree is cheap.
+        """
+        get_key = self._get_key
+        node: Any = self._finger
+        if node is None:
+            return None
+        start = node
+        parent = node.parent
+        if key < get_key(node.value):
+            # Stop at the first ancestor that lies before `key` in key order
+            while parent is not None:
+                if parent.right is node:
+                    if get_key(parent.value) <= key:
+                        break
+                    start = parent
+                node = parent
+                parent = node.parent
+            return start
+        # Stop at the first ancestor that lies after `key` in key order
+        while parent is not None:
+            if parent.left is node:
+                if key < get_key(parent.value):
+                    break
+                start = parent
+            node = parent
+            parent = node.parent
+        return start
+
+    def _descend(self, node: BinaryNode[T] | None, key: K) -> BinaryNode[T] | None:
+        get_key = self._get_key
         while node is not None:
-            node_key = self._get_key(node.value)
-            if node.left is not None and key < node_key:
+            if key < get_key(node.value):
+                if node.left is None:
+                    break
                 node = node.left
-            elif node.right is not None and key > node_key:
-                node = node.right
             else:
-                break
+                if node.right is None:
+                    break
+                node = node.right
         return node
 
+    def get_add_hint(self, value: T) -> Any:
+        node = self._root
+        assert(_is_optional_binary_node(node))
+        return self._descend(node, self._get_key(value))
+
+    def get_finger_hint(self, value: T) -> Any:
+        """
+        Like `get_add_hint`, but start searching from the node that was
+        inserted last instead of from the root.
+
+        Values that belong before the smallest or after the largest key are
+        attached to the end of the tree directly. Otherwise, this is much
+        cheaper than `get_add_hint` when `value` belongs close to the last
+        inserted node, but more expensive when it belongs far away from it.
+        """
+        get_key = self._get_key
+        key = get_key(value)
+        rightmost = self._rightmost
+        if rightmost is None:
+            return None
+        if not key < get_key(rightmost.value):
+            return rightmost
+        leftmost = nonnull(self._leftmost)
+        if key < get_key(leftmost.value):
+            return leftmost
+        node = self._climb_from_finger(key)
+        if node is None:
+            node = self._root
+            assert(_is_optional_binary_node(node))
+        return self._descend(node, key)
+
     def rotate_left(self, node: BinaryNode[T]) -> BinaryNode[T]:
         """
         Moves `node` to the left, causing `node.right` to become the new root.
@@ -103,6 +173,7 @@ class BinaryTree(Tree[T], Generic[T, K]):
             else:
                 parent.right = new_node
         new_node.parent = node.parent
+        node.parent = right
         node.right = right.left
         if right.left is not None:
             right.left.parent = node
@@ -199,32 +270,324 @@ class BinaryTree(Tree[T], Generic[T, K]):
         return y
 
     def __iter__(self) -> Iterator[T]:
-        if self._root is None:
-            return
-        assert(_is_binary_node(self._root))
-        stack: list[BinaryNode[T]] = [ self._root ]
-        while stack:
+        """
+        Generate all values in the tree ordered by their key.
+        """
+        stack = list[BinaryNode[T]]()
+        node = self._root
+        while True:
+            while node is not None:
+                assert(_is_binary_node(node))
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
             node = stack.pop()
             yield node.value
-            if node.left is not None:
-                stack.append(node.left)
-            if node.right is not None:
-                stack.append(node.right)
+            node = node.right
 
     def __len__(self) -> int:
         return self._count
 
+    @classmethod
+    def from_sorted(cls, values: Iterable[T], /, **options: Any) -> Self:
+        """
+        Build a perfectly balanced tree in O(n) from values that are already
+        sorted by their key.
+
+        `options`, such as `key`, are passed by keyword to the constructor of
+        the tree, so only the options that it accepts can be used.
+        """
+        tree = cls(**options)
+        tree.build_sorted(values if isinstance(values, Sequence) else list(values))
+        return tree
+
+    @classmethod
+    def from_iterable(cls, values: Iterable[T], /, **options: Any) -> Self:
+        """
+        Build a perfectly balanced tree in O(n log n) from values in any order.
+
+        `options` are passed to the constructor like in `from_sorted`.
+        """
+        tree = cls(**options)
+        tree.build_sorted(sorted(values, key=tree._get_key))
+        return tree
+
+    def build_sorted(self, values: Sequence[T]) -> None:
+        """
+        Replace the contents of this tree with `values`, which must be sorted
+        by their key.
+
+        Every node is created exactly once and the middle element of each
+        range becomes the root of its subtree, so the result is perfectly
+        balanced.
+        """
+
+        def build(lo: int, hi: int, parent: BinaryNode[T] | None) -> tuple[BinaryNode[T] | None, int]:
+            if lo >= hi:
+                return None, 0
+            mid = (lo + hi) // 2
+            node = self.create_node(values[mid])
+            node.parent = parent
+            node.left, left_height = build(lo, mid, node)
+            node.right, right_height = build(mid + 1, hi, node)
+            self.update_built_node(node, left_height, right_height)
+            return node, max(left_height, right_height) + 1
+
+        self._root, _ = build(0, len(values), None)
+        self._count = len(values)
+        root = self._root
+        assert(_is_optional_binary_node(root))
+        self._finger = root
+        self._leftmost = root.get_leftmost() if root is not None else None
+        self._rightmost = root.get_rightmost() if root is not None else None
+
+    def create_node(self, value: T) -> BinaryNode[T]:
+        return BinaryNode(value)
+
+    def update_built_node(self, node: BinaryNode[T], left_height: int, right_height: int) -> None:
+        """
+        Called by `build_sorted` for every node after both of its subtrees have been built.
+        """
+        pass
+
     @abstractmethod
     def add(self, value: T, /, hint: Any) -> None: ...
 
+    def update_path(self, node: BinaryNode[T] | None) -> None:
+        """
+        Called after a node was attached below or removed from below `node`,
+        before the tree is rebalanced.
+
+        Trees that store augmented data in their nodes override this method to
+        refresh that data on the path from `node` up to the root. Rotations
+        are expected to keep the data correct on their own.
+        """
+        pass
+
     def add_node(self, node: BinaryNode[T], /, hint: Any = None) -> None:
         if hint is None:
             hint = self.get_add_hint(node.value)
+        if hint is None:
+            assert(self._root is None)
+            self._root = node
+            self._finger = node
+            self._leftmost = node
+            self._rightmost = node
+            self._count += 1
+            return
         assert(isinstance(hint, BinaryNode))
         if self._get_key(node.value) < self._get_key(hint.value):
             hint.left = node
+            if hint is self._leftmost:
+                self._leftmost = node
         else:
             hint.right = node
+            if hint is self._rightmost:
+                self._rightmost = node
         node.parent = hint
+        self._finger = node
         self._count += 1
+        self.update_path(hint)
+
+    def add_many_sorted(self, values: Iterable[T]) -> None:
+        """
+        Add many values that are sorted by their key.
 
+        Every value is attached near the previous one, which is found by
+        climbing up from it instead of descending from the root, or directly
+        to the end of the tree when it has the largest key so far. Values in
+        any other order are also added correctly, only not as quickly.
+        """
+        for value in values:
+            self.add(value, self.get_finger_hint(value))
+
+    def _replace_child(self, node: BinaryNode[T], new_node: BinaryNode[T] | None) -> None:
+        """
+        Make `new_node` take the place of `node` in the parent of `node`.
+        """
+        parent = node.parent
+        if parent is None:
+            self._root = new_node
+        else:
+            assert(_is_binary_node(parent))
+            if parent.left == node:
+                parent.left = new_node
+            else:
+                parent.right = new_node
+        if new_node is not None:
+            new_node.parent = parent
+
+    def remove_node(self, node: BinaryNode[T]) -> tuple[BinaryNode[T] | None, bool]:
+        """
+        Unlink `node` from the tree without rebalancing.
+
+        When `node` has two children, its in-order successor is moved into its
+        place so that references to other nodes remain valid.
+
+        Returns the node whose subtree lost a level together with `True` if it
+        was its left subtree or `False` if it was its right subtree. The node
+        is `None` if the root itself was replaced.
+        """
+        if node is self._leftmost:
+            self._leftmost = node.next
+        if node is self._rightmost:
+            self._rightmost = node.prev
+        left = node.left
+        right = node.right
+        if left is None or right is None:
+            parent = node.parent
+            is_left = parent is not None and cast(BinaryNode[T], parent).left == node
+            self._replace_child(node, left if left is not None else right)
+        else:
+            successor = nonnull(right.get_leftmost())
+            if successor == right:
+                parent = successor
+                is_left = False
+            else:
+                parent = successor.parent
+                is_left = True
+                self._replace_child(successor, successor.right)
+                successor.right = right
+                right.parent = successor
+            successor.left = left
+            left.parent = successor
+            self._replace_child(node, successor)
+        node.parent = None
+        node.left = None
+        node.right = None
+        finger = parent if parent is not None else self._root
+        assert(_is_optional_binary_node(finger))
+        self._finger = finger
+        self._count -= 1
+        assert(parent is None or _is_binary_node(parent))
+        self.update_path(parent)
+        return parent, is_left
+
+    def lower_bound_node(self, key: K, /, strict: bool = False) -> BinaryNode[T] | None:
+        """
+        Get the leftmost node whose key is no smaller than `key`, or strictly
+        larger than `key` if `strict` is set.
+        """
+        get_key = self._get_key
+        node = self._root
+        result = None
+        while node is not None:
+            assert(_is_binary_node(node))
+            node_key = get_key(node.value)
+            if node_key < key or (strict and node_key == key):
+                node = node.right
+            else:
+                result = node
+                node = node.left
+        return result
+
+    def upper_bound_node(self, key: K, /, strict: bool = False) -> BinaryNode[T] | None:
+        """
+        Get the rightmost node whose key is no larger than `key`, or strictly
+        smaller than `key` if `strict` is set.
+        """
+        get_key = self._get_key
+        node = self._root
+        result = None
+        while node is not None:
+            assert(_is_binary_node(node))
+            node_key = get_key(node.value)
+            if node_key > key or (strict and node_key == key):
+                node = node.left
+            else:
+                result = node
+                node = node.right
+        return result
+
+    def find_node(self, value: T) -> BinaryNode[T] | None:
+        """
+        Get the node that holds `value`, or `None` if there is no such node.
+
+        Among nodes with equal keys, the one that was found first in key order
+        and compares equal to `value` is returned.
+        """
+        key = self._get_key(value)
+        node = self.lower_bound_node(key)
+        while node is not None and self._get_key(node.value) == key:
+            if node.value == value:
+                return node
+            node = node.next
+        return None
+
+    def find(self, key: K) -> T | None:
+        """
+        Get the first value whose key equals `key`, or `None` if there is no such value.
+        """
+        node = self.lower_bound_node(key)
+        if node is None or self._get_key(node.value) != key:
+            return None
+        return node.value
+
+    def floor(self, key: K) -> T | None:
+        """
+        Get the value with the largest key that is no larger than `key`.
+        """
+        node = self.upper_bound_node(key)
+        return node.value if node is not None else None
+
+    def ceiling(self, key: K) -> T | None:
+        """
+        Get the value with the smallest key that is no smaller than `key`.
+        """
+        node = self.lower_bound_node(key)
+        return node.value if node is not None else None
+
+    def irange(self, lo: K | None = None, hi: K | None = None, inclusive: tuple[bool, bool] = (True, True)) -> Iterator[T]:
+        """
+        Generate the values whose key lies between `lo` and `hi`, ordered by key.
+
+        A bound that is `None` is not checked. `inclusive` determines whether
+        values with a key equal to `lo` or `hi`, respectively, are included.
+        """
+        if lo is None:
+            node = self._root.get_leftmost() if self._root is not None else None # type: ignore
+        else:
+            node = self.lower_bound_node(lo, strict=not inclusive[0])
+        get_key = self._get_key
+        include_hi = inclusive[1]
+        while node is not None:
+            if hi is not None:
+                key = get_key(node.value)
+                if key > hi or (not include_hi and key == hi):
+                    break
+            yield node.value
+            node = node.next
+
+    def __contains__(self, value: object) -> bool:
+        return self.find_node(cast(T, value)) is not None
+
+    def discard(self, value: T) -> None:
+        """
+        Remove one occurrence of `value` from the tree, if it is present.
+        """
+        node = self.find_node(value)
+        if node is not None:
+            self.remove_node(node)
+
+    def pop_min(self) -> T:
+        """
+        Remove and return the value with the smallest key.
+        """
+        if self._root is None:
+            raise IndexError('pop from an empty tree')
+        assert(_is_binary_node(self._root))
+        node = nonnull(self._root.get_leftmost())
+        self.remove_node(node)
+        return node.value
+
+    def pop_max(self) -> T:
+        """
+        Remove and return the value with the largest key.
+        """
+        if self._root is None:
+            raise IndexError('pop from an empty tree')
+        assert(_is_binary_node(self._root))
+        node = nonnull(self._root.get_rightmost())
+        self.remove_node(node)
+        return node.value
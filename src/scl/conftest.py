@@ -0,0 +1,27 @@
+
+import random
+from collections.abc import Callable
+
+import pytest
+
+from .intervaltree import Interval
+
+
+def _random_intervals(n: int, seed: int) -> list[Interval[int, int]]:
+    rng = random.Random(seed)
+    intervals = list[Interval[int, int]]()
+    for i in range(0, n):
+        start = rng.randrange(0, 1000)
+        intervals.append(Interval(start, start + rng.choice([ 0, 1, 5, 20, 300 ]), i))
+    return intervals
+
+
+@pytest.fixture
+def random_intervals() -> Callable[[int, int], list[Interval[int, int]]]:
+    """
+    Generate `n` reproducible intervals of mixed lengths between `0` and `1300`.
+
+    The data of every interval is its index, so that equal bounds can still
+    be told apart.
+    """
+    return _random_intervals
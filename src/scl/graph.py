@@ -1,6 +1,8 @@
 
+from array import array
+from collections import deque
+from collections.abc import Collection, Generator, Hashable, Iterable, Iterator
 from dataclasses import dataclass
-from collections.abc import Generator, Hashable, Iterable, Iterator
 from typing import Generic, TypeVar
 
 _K = TypeVar('_K')
@@ -52,9 +54,15 @@ class _MultiDict(Generic[_K, _T]):
     def __len__(self) -> int:
         return self._count
 
+class CycleError(ValueError):
+    """
+    Raised when an operation that requires an acyclic graph encounters a cycle.
+    """
+    pass
+
 class GraphVertices(Generic[_V]):
 
-    def __init__(self, vertices: set[_V]) -> None:
+    def __init__(self, vertices: Collection[_V]) -> None:
         super().__init__()
         self._vertices = vertices
 
@@ -70,6 +78,7 @@ class Graph(Generic[_V]):
         super().__init__()
         self._vertices = set[_V]()
         self._src_to_dst = _MultiDict[_V, _V]()
+        self._dst_to_src = _MultiDict[_V, _V]()
         self._edge_count = 0
 
     def add_vertex(self, v: _V) -> None:
@@ -90,21 +99,24 @@ class Graph(Generic[_V]):
             self._vertices.remove(v)
         except KeyError:
             return
-        edges_to_remove = []
-        for dst in self._vertices:
-            for dst_2 in self._src_to_dst[dst]:
-                if dst_2 == v:
-                    edges_to_remove.append((dst, dst_2))
-        self._edge_count -= len(edges_to_remove) + self._src_to_dst.count(v)
-        for dst, src in edges_to_remove:
-            self._src_to_dst.remove(dst, src)
+        for dst in self._src_to_dst[v]:
+            if dst != v:
+                self._dst_to_src.remove(dst, v)
+        for src in self._dst_to_src[v]:
+            if src != v:
+                self._src_to_dst.remove(src, v)
+        self._edge_count -= self._src_to_dst.count(v) + self._dst_to_src.count(v)
+        if self._src_to_dst.has(v, v):
+            self._edge_count += 1
         self._src_to_dst.remove_key(v)
+        self._dst_to_src.remove_key(v)
 
     def add_edge(self, src: _V, dst: _V) -> None:
         self._vertices.add(src)
         self._vertices.add(dst)
         if not self._src_to_dst.has(src, dst):
             self._src_to_dst.add(src, dst)
+            self._dst_to_src.add(dst, src)
             self._edge_count += 1
 
     def count_edges(self) -> int:
@@ -113,6 +125,7 @@ class Graph(Generic[_V]):
     def remove_edge(self, src: _V, dst: _V) -> None:
         if self._src_to_dst.has(src, dst):
             self._src_to_dst.remove(src, dst)
+            self._dst_to_src.remove(dst, src)
             self._edge_count -= 1
 
     def has_edge(self, src: _V, dst: _V) -> bool:
@@ -121,61 +134,332 @@ class Graph(Generic[_V]):
     def get_out_vertices(self, src: _V) -> Iterable[_V]:
         return self._src_to_dst[src]
 
+    def count_out_edges(self, src: _V) -> int:
+        return self._src_to_dst.count(src)
+
+    def get_in_vertices(self, dst: _V) -> Iterable[_V]:
+        return self._dst_to_src[dst]
+
+    def count_in_edges(self, dst: _V) -> int:
+        return self._dst_to_src.count(dst)
+
+    def freeze(self) -> 'FrozenGraph[_V]':
+        """
+        Take an immutable, compact snapshot of this graph.
+        """
+        return FrozenGraph(self)
+
+class FrozenGraph(Generic[_V]):
+    """
+    A read-only graph in compressed sparse row format.
+
+    Every vertex is mapped to a dense integer. The targets of the out-edges of
+    vertex `i` are stored in `_targets[_offsets[i]:_offsets[i+1]]` and the
+    sources of its in-edges in `_sources[_in_offsets[i]:_in_offsets[i+1]]`.
+    """
+
+    def __init__(self, graph: Graph[_V]) -> None:
+        super().__init__()
+        vertices = list(graph.vertices)
+        index = { v: i for i, v in enumerate(vertices) }
+        n = len(vertices)
+        offsets = array('i', [ 0 ])
+        targets = array('i')
+        in_counts = [ 0 ] * (n + 1)
+        for v in vertices:
+            for w in graph.get_out_vertices(v):
+                j = index[w]
+                targets.append(j)
+                in_counts[j + 1] += 1
+            offsets.append(len(targets))
+        for i in range(0, n):
+            in_counts[i + 1] += in_counts[i]
+        in_offsets = array('i', in_counts)
+        sources = array('i', bytes(4 * len(targets)))
+        for i in range(0, n):
+            for k in range(offsets[i], offsets[i + 1]):
+                j = targets[k]
+                sources[in_counts[j]] = i
+                in_counts[j] += 1
+        self._vertices = vertices
+        self._index = index
+        self._offsets = offsets
+        self._targets = targets
+        self._in_offsets = in_offsets
+        self._sources = sources
+
+    def has_vertex(self, v: _V) -> bool:
+        return v in self._index
+
+    def count_vertices(self) -> int:
+        return len(self._vertices)
+
+    @property
+    def vertices(self) -> GraphVertices[_V]:
+        return GraphVertices(self._vertices)
+
+    def count_edges(self) -> int:
+        return len(self._targets)
+
+    def has_edge(self, src: _V, dst: _V) -> bool:
+        i = self._index.get(src)
+        j = self._index.get(dst)
+        if i is None or j is None:
+            return False
+        targets = self._targets
+        for k in range(self._offsets[i], self._offsets[i + 1]):
+            if targets[k] == j:
+                return True
+        return False
+
+    def get_out_vertices(self, src: _V) -> Iterable[_V]:
+        i = self._index.get(src)
+        if i is None:
+            return []
+        vertices = self._vertices
+        return [ vertices[j] for j in self._targets[self._offsets[i]:self._offsets[i + 1]] ]
+
+    def count_out_edges(self, src: _V) -> int:
+        i = self._index.get(src)
+        return self._offsets[i + 1] - self._offsets[i] if i is not None else 0
+
+    def get_in_vertices(self, dst: _V) -> Iterable[_V]:
+        j = self._index.get(dst)
+        if j is None:
+            return []
+        vertices = self._vertices
+        return [ vertices[i] for i in self._sources[self._in_offsets[j]:self._in_offsets[j + 1]] ]
+
+    def count_in_edges(self, dst: _V) -> int:
+        j = self._index.get(dst)
+        return self._in_offsets[j + 1] - self._in_offsets[j] if j is not None else 0
+
 def dump_graph(graph: Graph[_V]) -> None:
     for src in graph.vertices:
         for dst in graph.get_out_vertices(src):
             print(f' - {src} -> {dst}')
 
-def strongconnect(g: Graph[_V]) -> Generator[set[_V]]:
+def strongconnect(g: Graph[_V] | FrozenGraph[_V]) -> Generator[set[_V]]:
+    """
+    Generate the strongly connected components of `g` using Tarjan's algorithm.
 
-    @dataclass
-    class Data:
-        index: int | None = None
-        low_link: int | None = None
-        on_stack: bool = False
+    The depth-first search is driven by an explicit stack so that long paths
+    do not exhaust the interpreter's recursion limit. Components are
+    generated in reverse topological order.
+    """
 
-    mapping = dict[_V, Data]()
-    index = 0
+    if isinstance(g, FrozenGraph):
+        vertices = g._vertices
+        for scc in _strongconnect_csr(g._offsets, g._targets):
+            yield set(vertices[i] for i in scc)
+        return
+
+    index = dict[_V, int]()
+    low_link = dict[_V, int]()
+    on_stack = set[_V]()
     stack = list[_V]()
 
-    def get_data(v: _V) -> Data:
-        data = mapping.get(v)
-        if data is None:
-            data = Data()
-            mapping[v] = data
-        return data
+    for root in g.vertices:
 
-    def visit(v: _V) -> Generator[set[_V]]:
-        nonlocal index
+        if root in index:
+            continue
 
-        v_data = get_data(v)
-        v_data.index = index
-        v_data.low_link = index
-        index += 1
-        stack.append(v)
-        v_data.on_stack = True
+        index[root] = low_link[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [ (root, iter(g.get_out_vertices(root))) ]
 
-        for w in g.get_out_vertices(v):
-            w_data = get_data(w)
-            if w_data.index is None:
-                yield from visit(w)
-                assert(w_data.low_link is not None)
-                v_data.low_link = min(v_data.low_link, w_data.low_link)
-            elif w_data.on_stack:
-                v_data.low_link = min(v_data.low_link, w_data.index)
-
-        if v_data.low_link == v_data.index:
-            scc = set[_V]()
-            while True:
-                w = stack.pop()
-                w_data = get_data(w)
-                w_data.on_stack = False
-                scc.add(w)
-                if w == v:
+        while work:
+            v, out = work[-1]
+            for w in out:
+                if w not in index:
+                    index[w] = low_link[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(g.get_out_vertices(w))))
                     break
-            yield scc
-
+                if w in on_stack and index[w] < low_link[v]:
+                    low_link[v] = index[w]
+            else:
+                work.pop()
+                v_low_link = low_link[v]
+                if v_low_link == index[v]:
+                    scc = set[_V]()
+                    while True:
+                        w = stack.pop()
+                        on_stack.remove(w)
+                        scc.add(w)
+                        if w == v:
+                            break
+                    yield scc
+                if work:
+                    u = work[-1][0]
+                    if v_low_link < low_link[u]:
+                        low_link[u] = v_low_link
+
+
+def _strongconnect_csr(offsets: array, targets: array) -> Generator[list[int]]:
+    """
+    Same as `strongconnect` but working directly on the buffers of a `FrozenGraph`.
+    """
+
+    n = len(offsets) - 1
+    index = array('i', [ -1 ]) * n
+    low_link = array('i', [ 0 ]) * n
+    on_stack = bytearray(n)
+    stack = list[int]()
+    work_vertex = list[int]()
+    work_edge = list[int]()
+    counter = 0
+
+    for root in range(0, n):
+
+        if index[root] >= 0:
+            continue
+
+        index[root] = low_link[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work_vertex.append(root)
+        work_edge.append(offsets[root])
+
+        while work_vertex:
+            v = work_vertex[-1]
+            k = work_edge[-1]
+            end = offsets[v + 1]
+            while k < end:
+                w = targets[k]
+                k += 1
+                if index[w] < 0:
+                    work_edge[-1] = k
+                    index[w] = low_link[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work_vertex.append(w)
+                    work_edge.append(offsets[w])
+                    break
+                if on_stack[w] and index[w] < low_link[v]:
+                    low_link[v] = index[w]
+            else:
+                work_vertex.pop()
+                work_edge.pop()
+                v_low_link = low_link[v]
+                if v_low_link == index[v]:
+                    scc = list[int]()
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        scc.append(w)
+                        if w == v:
+                            break
+                    yield scc
+                if work_vertex:
+                    u = work_vertex[-1]
+                    if v_low_link < low_link[u]:
+                        low_link[u] = v_low_link
+
+
+def itoposort(g: Graph[_V] | FrozenGraph[_V]) -> Generator[_V]:
+    """
+    Lazily generate the vertices of `g` in topological order using Kahn's algorithm.
+
+    For every edge `src -> dst`, `src` is generated before `dst`. Raises
+    `CycleError` once no more vertices can be generated because the remaining
+    ones are part of a cycle.
+    """
+
+    if isinstance(g, FrozenGraph):
+        vertices = g._vertices
+        for i in _toposort_csr(g._offsets, g._targets, g._in_offsets):
+            yield vertices[i]
+        return
+
+    in_degree = dict[_V, int]()
+    queue = deque[_V]()
     for v in g.vertices:
-        if v not in mapping:
-            yield from visit(v)
+        k = g.count_in_edges(v)
+        if k == 0:
+            queue.append(v)
+        else:
+            in_degree[v] = k
 
+    while queue:
+        v = queue.popleft()
+        yield v
+        for w in g.get_out_vertices(v):
+            k = in_degree[w] - 1
+            if k == 0:
+                del in_degree[w]
+                queue.append(w)
+            else:
+                in_degree[w] = k
+
+    if in_degree:
+        raise CycleError(f'graph contains a cycle through {len(in_degree)} vertices')
+
+
+def toposort(g: Graph[_V] | FrozenGraph[_V]) -> list[_V]:
+    """
+    Return the vertices of `g` in topological order.
+
+    See `itoposort` for details.
+    """
+    return list(itoposort(g))
+
+
+def _toposort_csr(offsets: array, targets: array, in_offsets: array) -> Generator[int]:
+    n = len(offsets) - 1
+    in_degree = array('i', ( in_offsets[i+1] - in_offsets[i] for i in range(0, n) ))
+    queue = deque(i for i in range(0, n) if in_degree[i] == 0)
+    count = 0
+    while queue:
+        v = queue.popleft()
+        count += 1
+        yield v
+        for k in range(offsets[v], offsets[v + 1]):
+            w = targets[k]
+            in_degree[w] -= 1
+            if in_degree[w] == 0:
+                queue.append(w)
+    if count < n:
+        raise CycleError(f'graph contains a cycle through {n - count} vertices')
+
+
+@dataclass
+class Condensation(Generic[_V]):
+    """
+    The directed acyclic graph obtained by contracting each strongly connected
+    component of a graph to a single vertex.
+
+    Components are numbered in reverse topological order, so every edge
+    `a -> b` in `graph` satisfies `b < a`.
+    """
+
+    components: list[frozenset[_V]]
+    component_of: dict[_V, int]
+    graph: Graph[int]
+
+
+def condensation(g: Graph[_V] | FrozenGraph[_V]) -> Condensation[_V]:
+    """
+    Contract every strongly connected component of `g` to a single vertex.
+    """
+    components = list[frozenset[_V]]()
+    component_of = dict[_V, int]()
+    dag = Graph[int]()
+    for scc in strongconnect(g):
+        i = len(components)
+        components.append(frozenset(scc))
+        dag.add_vertex(i)
+        for v in scc:
+            component_of[v] = i
+        # Every successor outside of this component was already assigned
+        # a component because Tarjan generates them in reverse topological order.
+        for v in scc:
+            for w in g.get_out_vertices(v):
+                j = component_of[w]
+                if j != i:
+                    dag.add_edge(i, j)
+    return Condensation(components, component_of, dag)
@@ -0,0 +1,213 @@
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import accumulate
+from typing import Any, Generic
+
+from .intervaltree import Data, Interval, Point
+
+try:
+    import numpy as np
+except ImportError: # pragma: no cover
+    np = None
+
+
+def _repeat_ranges(lo: Any, counts: Any) -> Any:
+    """
+    Concatenate `arange(lo[i], lo[i] + counts[i])` for every `i` without a Python loop.
+    """
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(offsets.shape[0]) - offsets + np.repeat(lo, counts)
+
+
+class IntervalArray(Generic[Point, Data]):
+    """
+    A read-only index of closed intervals `[start, stop]` backed by flat arrays.
+
+    The start and stop points are stored in NumPy arrays sorted by start,
+    or in `array.array` buffers when NumPy is not installed. Two helper
+    arrays are precomputed: a running maximum of the stop points, which
+    bounds the first interval that can reach a query, and the maximum stop
+    point of every block of `block_size` intervals, which allows whole
+    blocks to be skipped.
+
+    Queries mirror those of `IntervalTree`. Batches of queries are answered
+    with vectorized `searchsorted` calls when NumPy is available. Because
+    intervals are not stored as objects, the query methods that return
+    `Interval`s have to create them; `query` returns plain indices instead
+    and is the fastest way to consume large result sets.
+    """
+
+    def __init__(self, intervals: Iterable[Interval[Point, Data]] | None = None, /, block_size: int = 64) -> None:
+        super().__init__()
+        starts = list[Point]()
+        stops = list[Point]()
+        data = list[Data | None]()
+        if intervals is not None:
+            for interval in intervals:
+                starts.append(interval.start)
+                stops.append(interval.stop)
+                data.append(interval.data)
+        self._load(starts, stops, data, block_size)
+
+    @classmethod
+    def from_arrays(cls, starts: Sequence[Point], stops: Sequence[Point], data: Sequence[Data] | None = None, /, block_size: int = 64) -> 'IntervalArray[Point, Data]':
+        """
+        Create an index directly from parallel sequences of start points, stop points and optional data.
+        """
+        result = cls.__new__(cls)
+        result._load(starts, stops, data, block_size)
+        return result
+
+    def _load(self, starts: Sequence[Point], stops: Sequence[Point], data: Sequence[Data | None] | None, block_size: int) -> None:
+        n = len(starts)
+        if len(stops) != n or (data is not None and len(data) != n):
+            raise ValueError('starts, stops and data must have the same length')
+        if data is not None and all(element is None for element in data):
+            data = None
+        self._block_size = block_size
+        if np is not None:
+            starts_array = np.asarray(starts)
+            stops_array = np.asarray(stops)
+            order = np.argsort(starts_array, kind='stable')
+            self._starts = starts_array[order]
+            self._stops = stops_array[order]
+            self._data = [ data[i] for i in order.tolist() ] if data is not None else None
+            self._max_stops = np.maximum.accumulate(self._stops) if n > 0 else self._stops
+            if n > 0:
+                self._block_max = np.maximum.reduceat(self._stops, np.arange(0, n, block_size))
+            else:
+                self._block_max = self._stops
+        else:
+            order = sorted(range(0, n), key=starts.__getitem__)
+            typecode = 'q' if all(isinstance(p, int) for p in starts) and all(isinstance(p, int) for p in stops) else 'd'
+            self._starts = array(typecode, (starts[i] for i in order))
+            self._stops = array(typecode, (stops[i] for i in order))
+            self._data = [ data[i] for i in order ] if data is not None else None
+            self._max_stops = array(typecode, accumulate(self._stops, max))
+            self._block_max = array(typecode, (max(self._stops[i:i+block_size]) for i in range(0, n, block_size)))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _make_interval(self, i: int) -> Interval[Point, Data]:
+        return Interval(self._starts[i].item() if np is not None else self._starts[i],
+                        self._stops[i].item() if np is not None else self._stops[i],
+                        self._data[i] if self._data is not None else None)
+
+    def __iter__(self) -> Iterator[Interval[Point, Data]]:
+        for i in range(0, len(self._starts)):
+            yield self._make_interval(i)
+
+    def query(self, starts: Sequence[Point], stops: Sequence[Point]) -> tuple[Sequence[int], Sequence[int]]:
+        """
+        Find all pairs of overlapping query and interval.
+
+        Returns two parallel sequences: the index of the query in `starts`
+        and `stops`, and the position of the overlapping interval in this
+        index. Pairs are ordered by query and then by interval start.
+        """
+        if np is not None:
+            return self._query_numpy(np.asarray(starts), np.asarray(stops))
+        return self._query_python(starts, stops)
+
+    def _query_numpy(self, query_starts: Any, query_stops: Any) -> tuple[Any, Any]:
+        block_size = self._block_size
+        lo = np.searchsorted(self._max_stops, query_starts, 'left')
+        hi = np.searchsorted(self._starts, query_stops, 'right')
+        queries = np.nonzero(hi > lo)[0]
+        lo = lo[queries]
+        hi = hi[queries]
+        # Expand every query to the blocks it spans and drop the blocks that end too early
+        first_block = lo // block_size
+        block_counts = (hi - 1) // block_size + 1 - first_block
+        block_queries = np.repeat(queries, block_counts)
+        blocks = _repeat_ranges(first_block, block_counts)
+        keep = self._block_max[blocks] >= query_starts[block_queries]
+        block_queries = block_queries[keep]
+        blocks = blocks[keep]
+        block_lo = np.maximum(blocks * block_size, np.repeat(lo, block_counts)[keep])
+        block_hi = np.minimum(blocks * block_size + block_size, np.repeat(hi, block_counts)[keep])
+        # Expand the remaining blocks to single intervals
+        counts = block_hi - block_lo
+        result_queries = np.repeat(block_queries, counts)
+        result_intervals = _repeat_ranges(block_lo, counts)
+        keep = self._stops[result_intervals] >= query_starts[result_queries]
+        return result_queries[keep], result_intervals[keep]
+
+    def _query_python(self, query_starts: Sequence[Point], query_stops: Sequence[Point]) -> tuple[list[int], list[int]]:
+        block_size = self._block_size
+        starts = self._starts
+        stops = self._stops
+        max_stops = self._max_stops
+        block_max = self._block_max
+        result_queries = list[int]()
+        result_intervals = list[int]()
+        for q, (start, stop) in enumerate(zip(query_starts, query_stops)):
+            lo = bisect_left(max_stops, start)
+            hi = bisect_right(starts, stop)
+            i = lo
+            while i < hi:
+                block = i // block_size
+                block_hi = min(hi, block * block_size + block_size)
+                if block_max[block] >= start:
+                    for j in range(i, block_hi):
+                        if stops[j] >= start:
+                            result_queries.append(q)
+                            result_intervals.append(j)
+                i = block_hi
+        return result_queries, result_intervals
+
+    def _group(self, count: int, queries: Sequence[int], intervals: Sequence[int]) -> list[list[Interval[Point, Data]]]:
+        results: list[list[Interval[Point, Data]]] = [ [] for _ in range(0, count) ]
+        if np is not None:
+            starts = self._starts[intervals].tolist()
+            stops = self._stops[intervals].tolist()
+            queries = queries.tolist() # type: ignore
+            intervals = intervals.tolist() # type: ignore
+        else:
+            starts = [ self._starts[i] for i in intervals ]
+            stops = [ self._stops[i] for i in intervals ]
+        data = self._data
+        if data is None:
+            for q, start, stop in zip(queries, starts, stops):
+                results[q].append(Interval(start, stop))
+        else:
+            for q, i, start, stop in zip(queries, intervals, starts, stops):
+                results[q].append(Interval(start, stop, data[i]))
+        return results
+
+    def overlapping_many(self, queries: Sequence[Interval[Point, Any]]) -> list[list[Interval[Point, Data]]]:
+        """
+        Answer many `overlapping` queries at once.
+
+        Returns one list of overlapping intervals per query, in the same order
+        as `queries`. Each list is ordered by start.
+        """
+        return self._group(len(queries), *self.query([ q.start for q in queries ], [ q.stop for q in queries ]))
+
+    def stab_many(self, points: Sequence[Point]) -> list[list[Interval[Point, Data]]]:
+        """
+        Answer many `overlap_point` queries at once.
+        """
+        return self._group(len(points), *self.query(points, points))
+
+    def overlapping(self, interval: Interval[Point, Any]) -> Iterable[Interval[Point, Data]]:
+        """
+        Get every interval that overlaps with `interval`, ordered by start.
+        """
+        return self.overlapping_many([ interval ])[0]
+
+    def overlap_point(self, p: Point) -> Iterable[Interval[Point, Data]]:
+        """
+        Get every interval that contains the point `p`, ordered by start.
+        """
+        return self.stab_many([ p ])[0]
+
+    def count_overlapping(self, interval: Interval[Point, Any]) -> int:
+        """
+        Count the intervals that overlap with `interval` without creating them.
+        """
+        _, intervals = self.query([ interval.start ], [ interval.stop ])
+        return len(intervals)
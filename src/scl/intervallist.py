@@ -1,36 +1,128 @@
 
-from collections.abc import Iterable, Iterator, MutableSet
+from bisect import bisect_right, insort
+from collections.abc import Iterable, Iterator, MutableSet, Sequence, Set
 from dataclasses import dataclass
-from typing import Generic, TypeVar
+from itertools import accumulate
+from operator import attrgetter
+from typing import Any, Generic, TypeVar
 
-from scl.util import Comparable, sort_inserted
+from scl.util import Comparable, binary_search, binary_search_left, binary_search_right, search_sorted_many, sort_inserted_many
 
 Point = TypeVar('Point', bound=Comparable)
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class Interval(Generic[Point]):
     start: Point
     stop: Point
 
+# Sorting on a tuple of the fields is much faster than going through the
+# __lt__ that is generated by the dataclass, but results in the same order.
+_interval_key = attrgetter('start', 'stop')
+
 class IntervalList(MutableSet[Interval[Point]], Generic[Point]):
+    """
+    A sorted array of half-open intervals `[start, stop)`.
+
+    Next to the intervals, a running maximum of their stop points is kept so
+    that queries only need to look at the intervals that can possibly
+    contain the queried point. Together with the list of start points, which
+    saves looking up the start of an interval on every probe of a search, it
+    is rebuilt lazily after a modification.
+    """
 
     def __init__(self, elements: Iterable[Interval[Point]] | None = None) -> None:
         super().__init__()
         self._elements: list[Interval[Point]] = []
+        self._max_stops: list[Point] | None = None
+        self._starts: list[Point] | None = None
         if elements is not None:
-            for element in elements:
-                self.add(element)
+            self.update(elements)
+
+    def _invalidate(self) -> None:
+        self._max_stops = None
+        self._starts = None
+
+    def _get_starts(self) -> list[Point]:
+        starts = self._starts
+        if starts is None:
+            starts = self._starts = [ element.start for element in self._elements ]
+        return starts
+
+    def _get_max_stops(self) -> list[Point]:
+        max_stops = self._max_stops
+        if max_stops is None:
+            max_stops = self._max_stops = list(accumulate((element.stop for element in self._elements), max))
+        return max_stops
 
     def within(self, needle: Interval[Point]) -> bool:
-        raise NotImplementedError()
+        """
+        Check whether every point of `needle` is covered by the union of the intervals in this list.
+        """
+        max_stops = self._get_max_stops()
+        starts = self._get_starts()
+        point = needle.start
+        while True:
+            i = bisect_right(starts, point)
+            if i == 0:
+                return False
+            reach = max_stops[i-1]
+            if reach <= point:
+                return False
+            if reach >= needle.stop:
+                return True
+            point = reach
 
     def overlap_point(self, p: Point) -> set[Interval[Point]]:
-        raise NotImplementedError()
+        """
+        Get all intervals that contain the point `p`.
+
+        Two binary searches narrow the candidates down to the intervals that
+        start no later than `p`, beginning with the first one where the
+        running maximum of the stops passes `p`. Every candidate is then
+        checked, so this takes O(log n + m) time, where `m` is the number of
+        candidates. `m` equals the number of results when no short interval
+        lies between longer ones, but a single long interval near the front
+        can make it approach `n`. Use `IntervalTree` when that matters.
+        """
+        elements = self._elements
+        # Intervals from `i` onwards are the first that may extend beyond `p`
+        i = bisect_right(self._get_max_stops(), p)
+        # Intervals up to `j` are the last that start no later than `p`
+        j = bisect_right(self._get_starts(), p)
+        return set(element for element in elements[i:j] if element.stop > p)
+
+    def stab_many(self, points: Sequence[Point]) -> list[set[Interval[Point]]]:
+        """
+        Answer many `overlap_point` queries at once.
+
+        Returns one set of intervals per point, in the same order as `points`.
+        The points are looked up in sorted order, with every search starting
+        from the position of the previous point. Like `overlap_point`, every
+        candidate interval of a point is checked, not only the results.
+        """
+        elements = self._elements
+        lo = search_sorted_many(self._get_max_stops(), points, side='right')
+        hi = search_sorted_many(self._get_starts(), points, side='right')
+        return [ set(element for element in elements[i:j] if element.stop > p) for p, i, j in zip(points, lo, hi) ]
 
     def add(self, value: Interval[Point]) -> None:
-        n = len(self._elements)
-        self._elements.append(value)
-        sort_inserted(self._elements, n)
+        insort(self._elements, value, key=_interval_key)
+        self._invalidate()
+
+    def update(self, values: Iterable[Interval[Point]]) -> None:
+        """
+        Add many intervals at once.
+
+        The new intervals are sorted separately and then merged with the
+        existing ones, which is much cheaper than adding them one by one.
+        """
+        elements = self._elements
+        start = len(elements)
+        elements.extend(values)
+        if len(elements) == start:
+            return
+        sort_inserted_many(elements, start, key=_interval_key)
+        self._invalidate()
 
     def addi(self, start: Point, stop: Point) -> None:
         self.add(Interval(start, stop))
@@ -42,7 +134,231 @@ class IntervalList(MutableSet[Interval[Point]], Generic[Point]):
         return iter(self._elements)
 
     def discard(self, value: Interval[Point]) -> None:
-        raise NotImplementedError()
+        i = binary_search(self._elements, value)
+        if i != -1:
+            del self._elements[i]
+            self._invalidate()
 
     def __len__(self) -> int:
         return len(self._elements)
+
+
+def _coalesce(elements: Iterable[Interval[Point]]) -> list[Interval[Point]]:
+    """
+    Merge overlapping and adjacent intervals of a list that is sorted by start.
+    """
+    result = list[Interval[Point]]()
+    start = None
+    stop = None
+    for element in elements:
+        if element.start >= element.stop:
+            continue
+        if stop is not None and element.start <= stop:
+            if element.stop > stop:
+                stop = element.stop
+        else:
+            if start is not None:
+                result.append(Interval(start, stop))
+            start = element.start
+            stop = element.stop
+    if start is not None:
+        result.append(Interval(start, stop))
+    return result
+
+
+class RangeSet(IntervalList[Point]):
+    """
+    A set of points stored as the union of half-open intervals `[start, stop)`.
+
+    Overlapping and adjacent intervals are merged as soon as they are
+    added, so the intervals in the list are always disjoint and the stop
+    points are sorted as well. Removing an interval splits the ranges that
+    it partially covers.
+    """
+
+    def _set_elements(self, elements: list[Interval[Point]]) -> None:
+        self._elements = elements
+        self._invalidate()
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[Interval[Point]]) -> 'RangeSet[Point]':
+        return cls(it)
+
+    def update(self, values: Iterable[Interval[Point]]) -> None:
+        elements = self._elements
+        start = len(elements)
+        elements.extend(values)
+        if len(elements) == start:
+            return
+        sort_inserted_many(elements, start, key=_interval_key)
+        self._set_elements(_coalesce(elements))
+
+    def add(self, value: Interval[Point]) -> None:
+        if value.start >= value.stop:
+            return
+        elements = self._elements
+        # Ranges in [i, j) touch `value` and will be merged with it
+        i = binary_search_left(elements, value.start, key='stop')
+        j = binary_search_right(elements, value.stop, key='start')
+        start = value.start
+        stop = value.stop
+        if i < j:
+            if elements[i].start < start:
+                start = elements[i].start
+            if elements[j-1].stop > stop:
+                stop = elements[j-1].stop
+        elements[i:j] = [ Interval(start, stop) ]
+        self._invalidate()
+
+    def discard(self, value: Interval[Point]) -> None:
+        if value.start >= value.stop:
+            return
+        elements = self._elements
+        # Ranges in [i, j) share at least one point with `value`
+        i = binary_search_right(elements, value.start, key='stop')
+        j = binary_search_left(elements, value.stop, key='start')
+        if i >= j:
+            return
+        pieces = list[Interval[Point]]()
+        if elements[i].start < value.start:
+            pieces.append(Interval(elements[i].start, value.start))
+        if elements[j-1].stop > value.stop:
+            pieces.append(Interval(value.stop, elements[j-1].stop))
+        elements[i:j] = pieces
+        self._invalidate()
+
+    def within(self, needle: Interval[Point]) -> bool:
+        elements = self._elements
+        i = bisect_right(self._get_starts(), needle.start)
+        if i == 0:
+            return False
+        stop = elements[i-1].stop
+        return stop > needle.start and stop >= needle.stop
+
+    def __contains__(self, x: object) -> bool:
+        try:
+            if isinstance(x, Interval):
+                return self.within(x)
+            elements = self._elements
+            i = bisect_right(self._get_starts(), x) # type: ignore
+            return i > 0 and elements[i-1].stop > x # type: ignore
+        except TypeError:
+            # Values that cannot be compared with the points are never contained
+            return False
+
+    def _coerce(self, other: Any) -> list[Interval[Point]]:
+        if isinstance(other, RangeSet):
+            return other._elements
+        return RangeSet(other)._elements
+
+    def __or__(self, other: Set[Any]) -> 'RangeSet[Point]':
+        a = self._elements
+        b = self._coerce(other)
+        merged = a + b
+        merged.sort(key=_interval_key)
+        result = RangeSet[Point]()
+        result._set_elements(_coalesce(merged))
+        return result
+
+    def __and__(self, other: Set[Any]) -> 'RangeSet[Point]':
+        a = self._elements
+        b = self._coerce(other)
+        elements = list[Interval[Point]]()
+        i = 0
+        j = 0
+        while i < len(a) and j < len(b):
+            start = max(a[i].start, b[j].start)
+            stop = min(a[i].stop, b[j].stop)
+            if start < stop:
+                elements.append(Interval(start, stop))
+            if a[i].stop < b[j].stop:
+                i += 1
+            else:
+                j += 1
+        result = RangeSet[Point]()
+        result._set_elements(elements)
+        return result
+
+    def __sub__(self, other: Set[Any]) -> 'RangeSet[Point]':
+        a = self._elements
+        b = self._coerce(other)
+        elements = list[Interval[Point]]()
+        j = 0
+        for element in a:
+            start = element.start
+            stop = element.stop
+            while j < len(b) and b[j].stop <= start:
+                j += 1
+            k = j
+            while k < len(b) and b[k].start < stop:
+                if b[k].start > start:
+                    elements.append(Interval(start, b[k].start))
+                if b[k].stop >= stop:
+                    start = stop
+                    break
+                start = b[k].stop
+                k += 1
+            if start < stop:
+                elements.append(Interval(start, stop))
+        result = RangeSet[Point]()
+        result._set_elements(elements)
+        return result
+
+    def __xor__(self, other: Set[Any]) -> 'RangeSet[Point]':
+        b = RangeSet[Point]()
+        b._set_elements(self._coerce(other))
+        return (self - b) | (b - self)
+
+    # The reflected operators of Set compare whole intervals, so they are
+    # defined in terms of the ones above as well.
+
+    def __ror__(self, other: Set[Any]) -> 'RangeSet[Point]':
+        return self | other
+
+    def __rand__(self, other: Set[Any]) -> 'RangeSet[Point]':
+        return self & other
+
+    def __rsub__(self, other: Set[Any]) -> 'RangeSet[Point]':
+        b = RangeSet[Point]()
+        b._set_elements(self._coerce(other))
+        return b - self
+
+    def __rxor__(self, other: Set[Any]) -> 'RangeSet[Point]':
+        return self ^ other
+
+    # The in-place operators of MutableSet add and discard whole intervals
+    # one by one, which is wrong for ranges that only partially overlap.
+
+    def __ior__(self, other: Set[Any]) -> 'RangeSet[Point]': # type: ignore[override]
+        self._set_elements((self | other)._elements)
+        return self
+
+    def __iand__(self, other: Set[Any]) -> 'RangeSet[Point]': # type: ignore[override]
+        self._set_elements((self & other)._elements)
+        return self
+
+    def __isub__(self, other: Set[Any]) -> 'RangeSet[Point]': # type: ignore[override]
+        self._set_elements((self - other)._elements)
+        return self
+
+    def __ixor__(self, other: Set[Any]) -> 'RangeSet[Point]': # type: ignore[override]
+        self._set_elements((self ^ other)._elements)
+        return self
+
+    def __le__(self, other: Set[Any]) -> bool:
+        return all(element in other for element in self._elements) if isinstance(other, RangeSet) else NotImplemented
+
+    def __ge__(self, other: Set[Any]) -> bool:
+        return other.__le__(self) if isinstance(other, RangeSet) else NotImplemented
+
+    def __lt__(self, other: Set[Any]) -> bool:
+        return self.__le__(other) and self != other if isinstance(other, RangeSet) else NotImplemented
+
+    def __gt__(self, other: Set[Any]) -> bool:
+        return other.__lt__(self) if isinstance(other, RangeSet) else NotImplemented
+
+    def __eq__(self, other: object) -> bool:
+        return self._elements == other._elements if isinstance(other, RangeSet) else NotImplemented
+
+    def isdisjoint(self, other: Iterable[Any]) -> bool:
+        return not (self & RangeSet(other))
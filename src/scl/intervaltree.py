@@ -1,19 +1,21 @@
 
-from collections.abc import Iterable
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
 from typing import Any, Generic, TypeIs, TypeVar, cast
 
 from scl.tree import Node
 
 from .util import nonnull
-from .binarytree import BinaryTree, BinaryNode
+from .avltree import AVLNode, AVLTree
+from .binarytree import BinaryNode
 
 
 Point = TypeVar('Point', bound=int | float)
 Data = TypeVar('Data', default=None)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Interval(Generic[Point, Data]):
 
     start: Point
@@ -25,7 +27,9 @@ class Interval(Generic[Point, Data]):
         return a.stop >= b.start and a.start <= b.stop
 
 
-class IntervalNode(BinaryNode[Interval[Point, Data]], Generic[Point, Data]):
+class IntervalNode(AVLNode[Interval[Point, Data]], Generic[Point, Data]):
+
+    __slots__ = ('max',)
 
     def __init__(self, value: Interval[Point, Data]) -> None:
         super().__init__(value)
@@ -51,21 +55,34 @@ def _is_interval_node(value: Any) -> TypeIs[IntervalNode]:
 
 
 def _as_interval_node(value: Node[Interval[Point, Data]]) -> IntervalNode[Point, Data]:
-    return cast(IntervalNode[Point, Data], value)
+    return cast('IntervalNode[Point, Data]', value)
 
 
 def _as_optional_interval_node(value: Node[Interval[Point, Data]] | None) -> IntervalNode[Point, Data] | None:
-    return cast(IntervalNode[Point, Data] | None, value)
+    return cast('IntervalNode[Point, Data] | None', value)
+
 
+class IntervalTree(AVLTree[Interval[Point, Data], Point]):
+    """
+    A self-balancing tree of intervals ordered by their start point.
 
-class IntervalTree(BinaryTree[Interval[Point, Data], Point]):
+    Every node is augmented with the largest stop point found in its subtree,
+    which allows overlap queries to skip entire subtrees. Because the queries
+    depend on this order, the tree does not accept a `key`.
+    """
 
     def __init__(self, values: Iterable[Interval[Point, Data]] | None = None) -> None:
-        super().__init__()
+        super().__init__('start')
         self._count = 0
         if values is not None:
-            for value in values:
-                self.add(value)
+            self.build_sorted(sorted(values, key=self._get_key))
+
+    def update_path(self, node: BinaryNode[Interval[Point, Data]] | None) -> None:
+        super().update_path(node)
+        while node is not None:
+            assert(_is_interval_node(node))
+            node.update_max()
+            node = node.parent
 
     def rotate_left(self, node: BinaryNode[Interval[Point, Data]]) -> BinaryNode[Interval[Point, Data]]:
         right = nonnull(node.right)
@@ -86,15 +103,16 @@ class IntervalTree(BinaryTree[Interval[Point, Data], Point]):
         return left
 
     def rotate_right_then_left(self, x: BinaryNode[Interval[Point, Data]]) -> BinaryNode[Interval[Point, Data]]:
-        z = nonnull(x.left)
-        y = nonnull(z.right)
+        z = nonnull(x.right)
+        y = nonnull(z.left)
         assert(_is_interval_node(x))
         assert(_is_interval_node(y))
         assert(_is_interval_node(z))
+        super().rotate_right_then_left(x)
         x.update_max() # left child of y
         z.update_max() # right child of y
         y.update_max() # root node
-        return super().rotate_right_then_left(x)
+        return y
 
     def rotate_left_then_right(self, x: BinaryNode[Interval[Point, Data]]) -> BinaryNode[Interval[Point, Data]]:
         z = nonnull(x.left)
@@ -102,52 +120,142 @@ class IntervalTree(BinaryTree[Interval[Point, Data], Point]):
         assert(_is_interval_node(x))
         assert(_is_interval_node(y))
         assert(_is_interval_node(z))
+        super().rotate_left_then_right(x)
         z.update_max() # left child of y
         x.update_max() # right child of y
         y.update_max() # root node
-        return super().rotate_left_then_right(x)
+        return y
 
-    def get_add_hint(self, value: Interval[Point, Data]) -> Any:
-        key = value.stop
-        assert(_is_interval_node(self._root))
-        node = self._root
-        while node is not None:
-            if node.left is not None and key < node.value.stop:
-                node = node.left
-            elif node.right is not None and key > node.value.stop:
-                node = node.right
-            else:
-                break
-        return node
+    def create_node(self, value: Interval[Point, Data]) -> BinaryNode[Interval[Point, Data]]:
+        return IntervalNode(value)
+
+    def update_built_node(self, node: BinaryNode[Interval[Point, Data]], left_height: int, right_height: int) -> None:
+        assert(_is_interval_node(node))
+        super().update_built_node(node, left_height, right_height)
+        node.update_max()
 
     def add(self, value: Interval[Point, Data], hint: Any = None) -> tuple[bool, Any]: # type: ignore
-        parent = cast(IntervalNode[Point, Data], hint) if hint is not None else self.get_add_hint(value)
-        if parent is None:
-            self._root = IntervalNode(value)
-            self._count += 1
-            return True, self._root
-        node = IntervalNode(value)
-        if value.stop < parent.value.stop:
-            parent.left = node
-        else:
-            parent.right = node
-        node.parent = parent
-        self._count += 1
+        node = self.create_node(value)
+        self.add_node(node, hint)
         return True, node
 
-    def overlapping(self, interval: Interval[Point, Data]) -> Iterable[Interval[Point, Data]]:
-        x = _as_optional_interval_node(self._root)
-        while x is not None and not Interval.overlaps(x.value, interval):
-            assert(_is_optional_interval_node(x.left))
-            if x.left is not None and x.left.max >= interval.start:
-                x = x.left
-            else:
-                x = x.right
-        while x is not None:
-            yield x.value
-            if not Interval.overlaps(x.value, interval):
+    def _iter_overlapping_nodes(self, start: Point, stop: Point) -> Iterator[IntervalNode[Point, Data]]:
+        """
+        Generate the nodes whose interval overlaps with `[start, stop]`, ordered by start.
+
+        Subtrees whose `max` lies before `start` are skipped and the
+        traversal ends at the first node that starts after `stop`.
+        """
+        stack = list[IntervalNode[Point, Data]]()
+        node = _as_optional_interval_node(self._root)
+        while True:
+            while node is not None and node.max >= start:
+                stack.append(node)
+                node = _as_optional_interval_node(node.left)
+            if not stack:
+                break
+            node = stack.pop()
+            if node.value.start > stop:
+                break
+            if node.value.stop >= start:
+                yield node
+            node = _as_optional_interval_node(node.right)
+
+    def overlapping(self, interval: Interval[Point, Any]) -> Iterable[Interval[Point, Data]]:
+        """
+        Generate every interval that overlaps with `interval`, ordered by start.
+        """
+        for node in self._iter_overlapping_nodes(interval.start, interval.stop):
+            yield node.value
+
+    def overlap_point(self, p: Point) -> Iterable[Interval[Point, Data]]:
+        """
+        Generate every interval that contains the point `p`, ordered by start.
+        """
+        for node in self._iter_overlapping_nodes(p, p):
+            yield node.value
+
+    def count_overlapping(self, interval: Interval[Point, Any]) -> int:
+        """
+        Count the intervals that overlap with `interval` without collecting them.
+        """
+        count = 0
+        for _ in self._iter_overlapping_nodes(interval.start, interval.stop):
+            count += 1
+        return count
+
+    def overlapping_many(self, queries: Sequence[Interval[Point, Any]]) -> list[list[Interval[Point, Data]]]:
+        """
+        Answer many `overlapping` queries in a single traversal of the tree.
+
+        Returns one list of overlapping intervals per query, in the same order
+        as `queries`. Each list is ordered by start.
+        """
+        return self._overlapping_many([ q.start for q in queries ], [ q.stop for q in queries ])
+
+    def stab_many(self, points: Sequence[Point]) -> list[list[Interval[Point, Data]]]:
+        """
+        Answer many `overlap_point` queries in a single traversal of the tree.
+
+        Returns one list of intervals per point, in the same order as `points`.
+        """
+        return self._overlapping_many(points, points)
+
+    def _overlapping_many(self, starts: Sequence[Point], stops: Sequence[Point]) -> list[list[Interval[Point, Data]]]:
+
+        results: list[list[Interval[Point, Data]]] = [ [] for _ in range(0, len(starts)) ]
+        get_start = starts.__getitem__
+
+        # `active` holds the indices of the queries that may still overlap
+        # something in the subtree of `node`, ordered by their start.
+        def visit(node: IntervalNode[Point, Data], active: list[int]) -> None:
+            k = bisect_right(active, node.max, key=get_start)
+            if k == 0:
+                return
+            if k < len(active):
+                active = active[:k]
+            left = _as_optional_interval_node(node.left)
+            if left is not None:
+                visit(left, active)
+            value = node.value
+            node_start = value.start
+            active = [ q for q in active if stops[q] >= node_start ]
+            for i in range(0, bisect_right(active, value.stop, key=get_start)):
+                results[active[i]].append(value)
+            right = _as_optional_interval_node(node.right)
+            if active and right is not None:
+                visit(right, active)
+
+        root = _as_optional_interval_node(self._root)
+        if root is not None:
+            visit(root, sorted(range(0, len(starts)), key=get_start))
+        return results
+
+    def envelop(self, interval: Interval[Point, Any]) -> Iterable[Interval[Point, Data]]:
+        """
+        Generate every interval that lies completely within `interval`, ordered by start.
+        """
+        start = interval.start
+        stop = interval.stop
+        stack = list[IntervalNode[Point, Data]]()
+        node = _as_optional_interval_node(self._root)
+        while True:
+            while node is not None:
+                if node.max < start:
+                    node = None
+                elif node.value.start < start:
+                    node = _as_optional_interval_node(node.right)
+                else:
+                    stack.append(node)
+                    node = _as_optional_interval_node(node.left)
+            if not stack:
+                break
+            node = stack.pop()
+            if node.value.start > stop:
                 break
-            x = x.next
+            if node.value.stop <= stop:
+                yield node.value
+            node = _as_optional_interval_node(node.right)
 
     def addi(self, start: Point, stop: Point, data: Data | None = None) -> None:
         self.add(Interval(start, stop, data))
@@ -155,19 +263,4 @@ class IntervalTree(BinaryTree[Interval[Point, Data], Point]):
     def __contains__(self, value: object) -> bool:
         if not isinstance(value, Interval):
             return False
-        key = value.stop
-        node = _as_optional_interval_node(self._root)
-        while node is not None:
-            if node.value.stop < key:
-                node = _as_optional_interval_node(node.left)
-            elif node.value.stop > key:
-                node = _as_optional_interval_node(node.right)
-            else:
-                break
-        return node is not None and node.value == value
-
-    def __len__(self) -> int:
-        return self._count
-
-    def discard(self, value: Interval[Point, Data]) -> None:
-        raise NotImplementedError()
+        return self.find_node(value) is not None
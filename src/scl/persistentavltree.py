@@ -0,0 +1,271 @@
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Generic, Self
+
+from .binarytree import K
+from .util import T, lift_key
+
+
+class PersistentAVLNode(Generic[T]):
+    """
+    A node of a `PersistentAVLTree`.
+
+    Nodes are never modified after they have been created, which is what
+    allows them to be shared between many versions of a tree. For the same
+    reason they do not point to their parent.
+    """
+
+    __slots__ = ('value', 'left', 'right', 'height')
+
+    def __init__(self, value: T, left: 'PersistentAVLNode[T] | None' = None, right: 'PersistentAVLNode[T] | None' = None) -> None:
+        self.value = value
+        self.left = left
+        self.right = right
+        self.height = max(_height(left), _height(right)) + 1
+
+
+def _height(node: PersistentAVLNode | None) -> int:
+    return node.height if node is not None else 0
+
+
+def _rebalance(value: T, left: PersistentAVLNode[T] | None, right: PersistentAVLNode[T] | None) -> PersistentAVLNode[T]:
+    """
+    Create a node from a value and two subtrees whose heights differ by at most two.
+    """
+    balance = _height(right) - _height(left)
+    if balance > 1:
+        assert(right is not None)
+        if _height(right.left) > _height(right.right):
+            # Rotate right, then left
+            y = right.left
+            assert(y is not None)
+            return PersistentAVLNode(y.value, PersistentAVLNode(value, left, y.left), PersistentAVLNode(right.value, y.right, right.right))
+        return PersistentAVLNode(right.value, PersistentAVLNode(value, left, right.left), right.right)
+    if balance < -1:
+        assert(left is not None)
+        if _height(left.right) > _height(left.left):
+            # Rotate left, then right
+            y = left.right
+            assert(y is not None)
+            return PersistentAVLNode(y.value, PersistentAVLNode(left.value, left.left, y.left), PersistentAVLNode(value, y.right, right))
+        return PersistentAVLNode(left.value, left.left, PersistentAVLNode(value, left.right, right))
+    return PersistentAVLNode(value, left, right)
+
+
+def _pop_min(node: PersistentAVLNode[T]) -> tuple[PersistentAVLNode[T] | None, T]:
+    if node.left is None:
+        return node.right, node.value
+    left, value = _pop_min(node.left)
+    return _rebalance(node.value, left, node.right), value
+
+
+def _join(left: PersistentAVLNode[T] | None, right: PersistentAVLNode[T] | None) -> PersistentAVLNode[T] | None:
+    """
+    Merge the subtrees of a node that is being removed.
+    """
+    if right is None:
+        return left
+    if left is None:
+        return right
+    right, successor = _pop_min(right)
+    return _rebalance(successor, left, right)
+
+
+class PersistentAVLTree(Generic[T, K]):
+    """
+    An immutable self-balancing binary search tree.
+
+    `add` and `remove` do not modify the tree but return a new one. Only
+    the O(log n) nodes on the path to the changed value are copied; all
+    other nodes are shared with the original tree. As a consequence, keeping
+    a snapshot of a tree is O(1) and a snapshot can be read from any number
+    of threads while a writer publishes new versions.
+    """
+
+    __slots__ = ('_root', '_count', '_get_key')
+
+    def __init__(self, values: Iterable[T] | None = None, /, key: str | Callable[[T], K] | None = None) -> None:
+        super().__init__()
+        get_key = lift_key(key)
+        self._get_key = get_key
+        self._root: PersistentAVLNode[T] | None = None
+        self._count = 0
+        if values is not None:
+            elements = sorted(values, key=get_key)
+            self._root = self._build_sorted(elements, 0, len(elements))
+            self._count = len(elements)
+
+    @staticmethod
+    def _build_sorted(values: Sequence[T], lo: int, hi: int) -> PersistentAVLNode[T] | None:
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        build = PersistentAVLTree._build_sorted
+        return PersistentAVLNode(values[mid], build(values, lo, mid), build(values, mid + 1, hi))
+
+    def _derive(self, root: PersistentAVLNode[T] | None, count: int) -> Self:
+        result = object.__new__(type(self))
+        result._get_key = self._get_key
+        result._root = root
+        result._count = count
+        return result
+
+    def add(self, value: T) -> Self:
+        """
+        Get a new tree that additionally contains `value`.
+
+        Values with equal keys are kept in insertion order.
+        """
+        get_key = self._get_key
+        key = get_key(value)
+
+        def insert(node: PersistentAVLNode[T] | None) -> PersistentAVLNode[T]:
+            if node is None:
+                return PersistentAVLNode(value)
+            if key < get_key(node.value):
+                return _rebalance(node.value, insert(node.left), node.right)
+            return _rebalance(node.value, node.left, insert(node.right))
+
+        return self._derive(insert(self._root), self._count + 1)
+
+    def _remove(self, value: T) -> PersistentAVLNode[T] | None:
+        # Returns the original root when `value` was not found
+        get_key = self._get_key
+        key = get_key(value)
+
+        def remove(node: PersistentAVLNode[T] | None) -> PersistentAVLNode[T] | None:
+            if node is None:
+                return None
+            node_key = get_key(node.value)
+            if key < node_key:
+                left = remove(node.left)
+                return node if left is node.left else _rebalance(node.value, left, node.right)
+            if key > node_key:
+                right = remove(node.right)
+                return node if right is node.right else _rebalance(node.value, node.left, right)
+            if node.value == value:
+                return _join(node.left, node.right)
+            # Rotations may have moved values with an equal key to either side
+            left = remove(node.left)
+            if left is not node.left:
+                return _rebalance(node.value, left, node.right)
+            right = remove(node.right)
+            return node if right is node.right else _rebalance(node.value, node.left, right)
+
+        return remove(self._root)
+
+    def discard(self, value: T) -> Self:
+        """
+        Get a new tree without one occurrence of `value`.
+
+        Returns this tree itself if `value` is not present.
+        """
+        root = self._remove(value)
+        if root is self._root:
+            return self
+        return self._derive(root, self._count - 1)
+
+    def remove(self, value: T) -> Self:
+        """
+        Get a new tree without one occurrence of `value` or raise `ValueError` if it is not present.
+        """
+        root = self._remove(value)
+        if root is self._root:
+            raise ValueError(f'{value!r} is not in tree')
+        return self._derive(root, self._count - 1)
+
+    def find(self, key: K) -> T | None:
+        """
+        Get the first value whose key equals `key`, or `None` if there is no such value.
+        """
+        get_key = self._get_key
+        node = self._root
+        result = None
+        while node is not None:
+            node_key = get_key(node.value)
+            if node_key < key:
+                node = node.right
+            else:
+                if node_key == key:
+                    result = node
+                node = node.left
+        return result.value if result is not None else None
+
+    def __contains__(self, value: object) -> bool:
+        get_key = self._get_key
+        key = get_key(value)
+        stack = [ self._root ]
+        while stack:
+            node = stack.pop()
+            while node is not None:
+                node_key = get_key(node.value)
+                if key < node_key:
+                    node = node.left
+                elif key > node_key:
+                    node = node.right
+                elif node.value == value:
+                    return True
+                else:
+                    stack.append(node.right)
+                    node = node.left
+        return False
+
+    def irange(self, lo: K | None = None, hi: K | None = None, inclusive: tuple[bool, bool] = (True, True)) -> Iterator[T]:
+        """
+        Generate the values whose key lies between `lo` and `hi`, ordered by key.
+
+        A bound that is `None` is not checked.
+        """
+        get_key = self._get_key
+        include_lo, include_hi = inclusive
+        stack = list[PersistentAVLNode[T]]()
+        node = self._root
+        while True:
+            while node is not None:
+                if lo is not None:
+                    key = get_key(node.value)
+                    if key < lo or (not include_lo and key == lo):
+                        node = node.right
+                        continue
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if hi is not None:
+                key = get_key(node.value)
+                if key > hi or (not include_hi and key == hi):
+                    break
+            yield node.value
+            node = node.right
+
+    def __iter__(self) -> Iterator[T]:
+        return self.irange()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)!r})'
+
+    def min(self) -> T:
+        """
+        Get the value with the smallest key.
+        """
+        node = self._root
+        if node is None:
+            raise ValueError('min() of an empty tree')
+        while node.left is not None:
+            node = node.left
+        return node.value
+
+    def max(self) -> T:
+        """
+        Get the value with the largest key.
+        """
+        node = self._root
+        if node is None:
+            raise ValueError('max() of an empty tree')
+        while node.right is not None:
+            node = node.right
+        return node.value
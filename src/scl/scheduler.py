@@ -0,0 +1,143 @@
+
+import os
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from .graph import FrozenGraph, Graph, condensation
+
+_V = TypeVar('_V', bound=Hashable)
+_R = TypeVar('_R')
+
+
+@dataclass
+class ScheduleResult(Generic[_V, _R]):
+    """
+    The outcome of running `schedule` over a graph.
+
+    All times are expressed in seconds. `idle_time` is `None` when the
+    number of workers of the executor was not known.
+    """
+
+    results: dict[_V, _R]
+    durations: dict[_V, float]
+    wall_time: float
+    busy_time: float
+    idle_time: float | None
+    critical_path: list[_V]
+    critical_path_length: float
+
+
+def _run_component(fn: Callable[[_V], _R], members: list[_V]) -> list[tuple[_R, float]]:
+    outputs = list[tuple[_R, float]]()
+    for v in members:
+        start = time.perf_counter()
+        result = fn(v)
+        outputs.append((result, time.perf_counter() - start))
+    return outputs
+
+
+def schedule(
+    g: Graph[_V] | FrozenGraph[_V],
+    fn: Callable[[_V], _R],
+    /,
+    executor: Executor | None = None,
+    max_workers: int | None = None,
+) -> ScheduleResult[_V, _R]:
+    """
+    Call `fn` on every vertex of `g`, running independent vertices concurrently.
+
+    An edge `src -> dst` means that `fn(src)` must have returned before
+    `fn(dst)` is started. A vertex is submitted as soon as all of its
+    predecessors have finished, so there are no barriers between levels.
+    Vertices that are part of the same cycle are run one after the other in
+    a single task.
+
+    `executor` may be any `concurrent.futures.Executor`. When it is a process
+    pool, `fn` and the vertices must be picklable. When no executor is given,
+    a thread pool with `max_workers` threads is created for the duration of
+    the call, with one thread per CPU by default. When an executor is given,
+    `max_workers` should be the number of workers it runs, which is only
+    used to compute the idle time.
+
+    If `fn` raises, tasks that have not started yet are cancelled and the
+    exception is propagated.
+    """
+
+    owns_executor = executor is None
+    if executor is None:
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    c = condensation(g)
+    dag = c.graph
+    members = [ list(component) for component in c.components ]
+    remaining = [ dag.count_in_edges(i) for i in range(0, len(members)) ]
+    pending = dict[Future[list[tuple[_R, float]]], int]()
+    results = dict[_V, _R]()
+    durations = dict[_V, float]()
+
+    def submit(i: int) -> None:
+        pending[executor.submit(_run_component, fn, members[i])] = i
+
+    start = time.perf_counter()
+    try:
+        for i, k in enumerate(remaining):
+            if k == 0:
+                submit(i)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                for v, (result, duration) in zip(members[i], future.result()):
+                    results[v] = result
+                    durations[v] = duration
+                for j in dag.get_out_vertices(i):
+                    remaining[j] -= 1
+                    if remaining[j] == 0:
+                        submit(j)
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        raise
+    finally:
+        if owns_executor:
+            executor.shutdown(wait=True)
+    wall_time = time.perf_counter() - start
+
+    # Components are numbered in reverse topological order, so iterating
+    # backwards visits every component after all of its predecessors.
+    finish = [ 0.0 ] * len(members)
+    via: list[int | None] = [ None ] * len(members)
+    for i in reversed(range(0, len(members))):
+        earliest = 0.0
+        for j in dag.get_in_vertices(i):
+            if finish[j] > earliest:
+                earliest = finish[j]
+                via[i] = j
+        finish[i] = earliest + sum(durations[v] for v in members[i])
+
+    critical_path = list[_V]()
+    critical_path_length = 0.0
+    if members:
+        last: int | None = max(range(0, len(members)), key=lambda i: finish[i])
+        critical_path_length = finish[last]
+        while last is not None:
+            critical_path.extend(reversed(members[last]))
+            last = via[last]
+        critical_path.reverse()
+
+    busy_time = sum(durations.values())
+
+    return ScheduleResult(
+        results,
+        durations,
+        wall_time,
+        busy_time,
+        max(0.0, max_workers * wall_time - busy_time) if max_workers is not None else None,
+        critical_path,
+        critical_path_length,
+    )
@@ -0,0 +1,336 @@
+
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping
+from itertools import accumulate, chain
+from typing import Any, Generic, TypeVar, overload
+
+from .util import Comparable, T, lift_key, sort_inserted_many
+
+
+KT = TypeVar('KT')
+VT = TypeVar('VT')
+
+
+class SortedList(Generic[T]):
+    """
+    A sorted collection of values, possibly with duplicates.
+
+    Values are stored in a list of sorted lists of a few hundred elements
+    each. Lookups bisect the list of per-chunk maximums and then the chunk
+    itself, and inserts only shift the elements of a single chunk. This
+    avoids the per-node objects and pointer chasing of a binary tree.
+    Chunks that grow beyond twice `load` are split, and chunks that shrink
+    below half of `load` are merged into their neighbour.
+
+    `key` follows the same convention as the rest of this library: the name
+    of an attribute, a function, or `None` to compare the values themselves.
+    """
+
+    def __init__(self, values: Iterable[T] | None = None, /, key: str | Callable[[T], Comparable] | None = None, load: int = 500) -> None:
+        super().__init__()
+        self._key = lift_key(key) if key is not None else None
+        self._load = load
+        self._lists = list[list[T]]()
+        # When no key is given the chunks of keys are the chunks of values themselves
+        self._keys = list[list[Any]]() if self._key is not None else self._lists
+        self._maxes = list[Any]()
+        self._offsets: list[int] | None = None
+        self._count = 0
+        if values is not None:
+            self.update(values)
+
+    def _reset(self, values: list[T], keys: list[Any]) -> None:
+        load = self._load
+        self._lists = [ values[i:i+load] for i in range(0, len(values), load) ]
+        self._keys = [ keys[i:i+load] for i in range(0, len(keys), load) ] if self._key is not None else self._lists
+        self._maxes = [ chunk[-1] for chunk in self._keys ]
+        self._offsets = None
+        self._count = len(values)
+
+    def update(self, values: Iterable[T]) -> None:
+        """
+        Add many values at once by sorting them and merging them with the existing values.
+        """
+        all_values = list(chain.from_iterable(self._lists))
+        start = len(all_values)
+        all_values.extend(values)
+        if len(all_values) == start:
+            return
+        sort_inserted_many(all_values, start, key=self._key)
+        self._reset(all_values, all_values if self._key is None else list(map(self._key, all_values)))
+
+    def _split(self, i: int) -> None:
+        load = self._load
+        chunk = self._lists[i]
+        self._lists[i:i+1] = [ chunk[:load], chunk[load:] ]
+        if self._key is not None:
+            keys = self._keys[i]
+            self._keys[i:i+1] = [ keys[:load], keys[load:] ]
+        self._maxes[i:i+1] = [ self._keys[i][-1], self._keys[i+1][-1] ]
+
+    def add(self, value: T) -> None:
+        key = self._key(value) if self._key is not None else value
+        maxes = self._maxes
+        if not maxes:
+            self._lists.append([ value ])
+            if self._key is not None:
+                self._keys.append([ key ])
+            maxes.append(key)
+        else:
+            i = bisect_right(maxes, key)
+            if i == len(maxes):
+                i -= 1
+                self._lists[i].append(value)
+                if self._key is not None:
+                    self._keys[i].append(key)
+                maxes[i] = key
+            elif self._key is None:
+                insort(self._lists[i], value)
+            else:
+                keys = self._keys[i]
+                j = bisect_right(keys, key)
+                keys.insert(j, key)
+                self._lists[i].insert(j, value)
+            if len(self._lists[i]) > 2 * self._load:
+                self._split(i)
+        self._offsets = None
+        self._count += 1
+
+    def _merge(self, i: int) -> None:
+        # Append chunk `i` to chunk `i - 1`
+        self._lists[i-1].extend(self._lists[i])
+        del self._lists[i]
+        if self._key is not None:
+            self._keys[i-1].extend(self._keys[i])
+            del self._keys[i]
+        del self._maxes[i]
+        self._maxes[i-1] = self._keys[i-1][-1]
+        if len(self._lists[i-1]) > 2 * self._load:
+            self._split(i - 1)
+
+    def _delete(self, i: int, j: int) -> None:
+        chunk = self._lists[i]
+        del chunk[j]
+        if self._key is not None:
+            del self._keys[i][j]
+        if len(chunk) < self._load // 2 and len(self._lists) > 1:
+            # Keep the chunks from becoming too small to be worth a bisect of the maximums
+            self._merge(i if i > 0 else 1)
+        elif chunk:
+            self._maxes[i] = self._keys[i][-1]
+        else:
+            del self._lists[i]
+            if self._key is not None:
+                del self._keys[i]
+            del self._maxes[i]
+        self._offsets = None
+        self._count -= 1
+
+    def _locate(self, value: T) -> tuple[int, int] | None:
+        key = self._key(value) if self._key is not None else value
+        i = bisect_left(self._maxes, key)
+        while i < len(self._maxes):
+            keys = self._keys[i]
+            j = bisect_left(keys, key)
+            chunk = self._lists[i]
+            while j < len(chunk):
+                if keys[j] != key:
+                    return None
+                if chunk[j] == value:
+                    return i, j
+                j += 1
+            i += 1
+        return None
+
+    def discard(self, value: T) -> None:
+        """
+        Remove one occurrence of `value`, if it is present.
+        """
+        position = self._locate(value)
+        if position is not None:
+            self._delete(*position)
+
+    def remove(self, value: T) -> None:
+        """
+        Remove one occurrence of `value` or raise `ValueError` if it is not present.
+        """
+        position = self._locate(value)
+        if position is None:
+            raise ValueError(f'{value!r} is not in list')
+        self._delete(*position)
+
+    def __contains__(self, value: object) -> bool:
+        return self._locate(value) is not None # type: ignore
+
+    def _get_offsets(self) -> list[int]:
+        offsets = self._offsets
+        if offsets is None:
+            offsets = self._offsets = list(accumulate((len(chunk) for chunk in self._lists), initial=0))
+        return offsets
+
+    def _position(self, index: int) -> tuple[int, int]:
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError('list index out of range')
+        offsets = self._get_offsets()
+        i = bisect_right(offsets, index) - 1
+        return i, index - offsets[i]
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step == 1:
+                if start >= stop:
+                    return []
+                i, j = self._position(start)
+                result = list[T]()
+                remaining = stop - start
+                while remaining > 0:
+                    chunk = self._lists[i][j:j+remaining]
+                    result.extend(chunk)
+                    remaining -= len(chunk)
+                    i += 1
+                    j = 0
+                return result
+            return [ self[k] for k in range(start, stop, step) ]
+        i, j = self._position(index)
+        return self._lists[i][j]
+
+    def pop(self, index: int = -1) -> T:
+        """
+        Remove and return the value at `index`, which is the last value by default.
+        """
+        i, j = self._position(index)
+        value = self._lists[i][j]
+        self._delete(i, j)
+        return value
+
+    def _bisect(self, key: Any, right: bool) -> int:
+        search = bisect_right if right else bisect_left
+        i = search(self._maxes, key)
+        if i == len(self._maxes):
+            return self._count
+        return self._get_offsets()[i] + search(self._keys[i], key)
+
+    def bisect_left(self, key: Any) -> int:
+        """
+        Get the position of the first value whose key is no smaller than `key`.
+        """
+        return self._bisect(key, False)
+
+    def bisect_right(self, key: Any) -> int:
+        """
+        Get the position of the first value whose key is larger than `key`.
+        """
+        return self._bisect(key, True)
+
+    def irange(self, lo: Any = None, hi: Any = None, inclusive: tuple[bool, bool] = (True, True)) -> Iterator[T]:
+        """
+        Generate the values whose key lies between `lo` and `hi`, ordered by key.
+
+        A bound that is `None` is not checked.
+        """
+        start = 0 if lo is None else self._bisect(lo, not inclusive[0])
+        stop = self._count if hi is None else self._bisect(hi, inclusive[1])
+        if start >= stop:
+            return
+        i, j = self._position(start)
+        remaining = stop - start
+        lists = self._lists
+        while remaining > 0:
+            chunk = lists[i]
+            end = min(len(chunk), j + remaining)
+            yield from chunk[j:end]
+            remaining -= end - j
+            i += 1
+            j = 0
+
+    def __iter__(self) -> Iterator[T]:
+        return chain.from_iterable(self._lists)
+
+    def __reversed__(self) -> Iterator[T]:
+        return chain.from_iterable(reversed(chunk) for chunk in reversed(self._lists))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)!r})'
+
+
+class SortedDict(MutableMapping[KT, VT]):
+    """
+    A dictionary that iterates over its keys in sorted order.
+
+    Values are stored in a plain `dict`, so lookups by key stay O(1), while
+    the keys are additionally kept in a `SortedList`. `key` determines the
+    order of the keys and follows the same convention as `SortedList`.
+    """
+
+    def __init__(self, items: Mapping[KT, VT] | Iterable[tuple[KT, VT]] | None = None, /, key: str | Callable[[KT], Comparable] | None = None) -> None:
+        super().__init__()
+        self._dict = dict[KT, VT]()
+        self._keys = SortedList[KT](key=key)
+        if items is not None:
+            self._dict.update(items)
+            self._keys.update(self._dict)
+
+    def __getitem__(self, key: KT) -> VT:
+        return self._dict[key]
+
+    def __setitem__(self, key: KT, value: VT) -> None:
+        if key not in self._dict:
+            self._keys.add(key)
+        self._dict[key] = value
+
+    def __delitem__(self, key: KT) -> None:
+        del self._dict[key]
+        self._keys.remove(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._dict
+
+    def __iter__(self) -> Iterator[KT]:
+        return iter(self._keys)
+
+    def __reversed__(self) -> Iterator[KT]:
+        return reversed(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._dict)
+
+    def peekitem(self, index: int = -1) -> tuple[KT, VT]:
+        """
+        Get the key and value at position `index` in key order, which is the last one by default.
+        """
+        key = self._keys[index]
+        return key, self._dict[key]
+
+    def popitem(self, index: int = -1) -> tuple[KT, VT]: # type: ignore[override]
+        """
+        Remove and return the key and value at position `index` in key order.
+        """
+        if not self._dict:
+            raise KeyError('popitem(): dictionary is empty')
+        key = self._keys.pop(index)
+        return key, self._dict.pop(key)
+
+    def irange(self, lo: Any = None, hi: Any = None, inclusive: tuple[bool, bool] = (True, True)) -> Iterator[KT]:
+        """
+        Generate the keys that lie between `lo` and `hi`, in sorted order.
+        """
+        return self._keys.irange(lo, hi, inclusive)
+
+    def bisect_left(self, key: Any) -> int:
+        return self._keys.bisect_left(key)
+
+    def bisect_right(self, key: Any) -> int:
+        return self._keys.bisect_right(key)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({ {key: self._dict[key] for key in self._keys}!r})'
@@ -0,0 +1,360 @@
+
+import random
+
+from .avltree import AVLTree
+
+
+def _assert_invariants_hold(t: AVLTree) -> None:
+    count = 0
+    def visit(node) -> int:
+        nonlocal count
+        if node is None:
+            return 0
+        count += 1
+        if node.left is not None:
+            assert(node.left.parent is node)
+            assert(node.left.value <= node.value)
+        if node.right is not None:
+            assert(node.right.parent is node)
+            assert(node.right.value >= node.value)
+        left_height = visit(node.left)
+        right_height = visit(node.right)
+        assert(node.balance == right_height - left_height)
+        assert(abs(node.balance) <= 1)
+        return max(left_height, right_height) + 1
+    if t._root is not None:
+        assert(t._root.parent is None)
+    visit(t._root)
+    assert(count == len(t))
+
+
+def test_avltree_add():
+    rng = random.Random(1)
+    t = AVLTree[int, int]()
+    values = [ rng.randrange(0, 100) for _ in range(0, 500) ]
+    for value in values:
+        t.add(value)
+        _assert_invariants_hold(t)
+    assert(sorted(t) == sorted(values))
+
+
+def test_avltree_add_sorted():
+    t = AVLTree[int, int]()
+    for value in range(0, 1000):
+        t.add(value)
+    _assert_invariants_hold(t)
+    t = AVLTree[int, int]()
+    for value in reversed(range(0, 1000)):
+        t.add(value)
+    _assert_invariants_hold(t)
+
+
+def test_avltree_remove_node():
+    rng = random.Random(2)
+    t = AVLTree[int, int]()
+    for value in range(0, 300):
+        t.add(value)
+    nodes = []
+    stack = [ t._root ]
+    while stack:
+        node = stack.pop()
+        if node is not None:
+            nodes.append(node)
+            stack.append(node.left)
+            stack.append(node.right)
+    rng.shuffle(nodes)
+    remaining = set(range(0, 300))
+    for node in nodes:
+        t.remove_node(node)
+        remaining.remove(node.value)
+        _assert_invariants_hold(t)
+        assert(set(t) == remaining)
+    assert(t._root is None)
+
+
+def test_avltree_from_sorted():
+    for n in [ 0, 1, 2, 3, 7, 8, 100, 1023, 1024 ]:
+        t = AVLTree[int, int].from_sorted(range(0, n))
+        _assert_invariants_hold(t)
+        assert(sorted(t) == list(range(0, n)))
+        # The tree must remain usable after a bulk load
+        t.add(n // 2)
+        _assert_invariants_hold(t)
+
+
+def test_avltree_from_iterable():
+    rng = random.Random(3)
+    values = [ rng.randrange(0, 50) for _ in range(0, 200) ]
+    t = AVLTree[int, int].from_iterable(values)
+    _assert_invariants_hold(t)
+    assert(sorted(t) == sorted(values))
+    t = AVLTree[str, int].from_iterable([ 'ccc', 'a', 'bb' ], key=len)
+    assert(t._root is not None and t._root.value == 'bb')
+
+
+def test_avltree_discard():
+    rng = random.Random(4)
+    values = [ rng.randrange(0, 100) for _ in range(0, 400) ]
+    t = AVLTree[int, int].from_iterable(values)
+    rng.shuffle(values)
+    remaining = sorted(values)
+    for value in values[:300]:
+        t.discard(value)
+        remaining.remove(value)
+        _assert_invariants_hold(t)
+        assert(sorted(t) == remaining)
+    t.discard(1000)
+    assert(len(t) == 100)
+
+
+def _assert_invariants_hold_by_key(t: AVLTree) -> None:
+    def visit(node) -> int:
+        if node is None:
+            return 0
+        left_height = visit(node.left)
+        right_height = visit(node.right)
+        assert(node.balance == right_height - left_height)
+        return max(left_height, right_height) + 1
+    visit(t._root)
+
+
+def test_avltree_discard_by_key():
+    t = AVLTree[tuple[int, str], int](key=lambda value: value[0])
+    t.add((1, 'a'))
+    t.add((1, 'b'))
+    t.add((0, 'c'))
+    t.add((1, 'c'))
+    t.discard((1, 'b'))
+    assert(sorted(t) == [ (0, 'c'), (1, 'a'), (1, 'c') ])
+    t.discard((1, 'd'))
+    assert(len(t) == 3)
+    _assert_invariants_hold_by_key(t)
+
+
+def test_avltree_pop():
+    rng = random.Random(5)
+    values = [ rng.randrange(0, 1000) for _ in range(0, 200) ]
+    t = AVLTree[int, int].from_iterable(values)
+    values.sort()
+    for i in range(0, 100):
+        assert(t.pop_min() == values[i])
+        assert(t.pop_max() == values[-i-1])
+        _assert_invariants_hold(t)
+    assert(len(t) == 0)
+    try:
+        t.pop_min()
+        assert(False)
+    except IndexError:
+        pass
+
+
+def test_avltree_iter_sorted():
+    rng = random.Random(6)
+    values = [ rng.randrange(0, 100) for _ in range(0, 300) ]
+    t = AVLTree[int, int]()
+    for value in values:
+        t.add(value)
+    assert(list(t) == sorted(values))
+
+
+def test_avltree_lookup():
+    t = AVLTree[int, int].from_iterable([ 10, 20, 20, 30, 40 ])
+    assert(t.find(20) == 20)
+    assert(t.find(25) is None)
+    assert(20 in t)
+    assert(25 not in t)
+    assert(t.floor(25) == 20)
+    assert(t.floor(20) == 20)
+    assert(t.floor(9) is None)
+    assert(t.ceiling(25) == 30)
+    assert(t.ceiling(30) == 30)
+    assert(t.ceiling(41) is None)
+    t = AVLTree[str, int](key=len)
+    t.add('aa')
+    t.add('bbbb')
+    assert(t.find(2) == 'aa')
+    assert(t.floor(3) == 'aa')
+    assert(t.ceiling(3) == 'bbbb')
+    assert('aa' in t)
+    assert('cc' not in t)
+
+
+def test_avltree_irange():
+    rng = random.Random(7)
+    values = sorted(rng.randrange(0, 100) for _ in range(0, 300))
+    t = AVLTree[int, int].from_iterable(values)
+    for lo in [ None, -1, 0, 17, 50, 99, 100 ]:
+        for hi in [ None, -1, 0, 17, 50, 99, 100 ]:
+            for inclusive in [ (True, True), (True, False), (False, True), (False, False) ]:
+                expected = [ v for v in values
+                    if (lo is None or (v >= lo if inclusive[0] else v > lo))
+                    and (hi is None or (v <= hi if inclusive[1] else v < hi)) ]
+                assert(list(t.irange(lo, hi, inclusive)) == expected)
+    assert(list(AVLTree[int, int]().irange()) == [])
+
+
+def _assert_sizes_hold(t: AVLTree) -> None:
+    def visit(node) -> int:
+        if node is None:
+            return 0
+        size = visit(node.left) + visit(node.right) + 1
+        assert(node.size == size)
+        return size
+    assert(visit(t._root) == len(t))
+
+
+def test_avltree_order_statistics():
+    rng = random.Random(8)
+    t = AVLTree[int, int](order_statistics=True)
+    values = list[int]()
+    for _ in range(0, 300):
+        value = rng.randrange(0, 100)
+        t.add(value)
+        values.append(value)
+        _assert_invariants_hold(t)
+        _assert_sizes_hold(t)
+    for _ in range(0, 150):
+        value = rng.choice(values)
+        t.discard(value)
+        values.remove(value)
+        _assert_invariants_hold(t)
+        _assert_sizes_hold(t)
+    values.sort()
+    for i in range(0, len(values)):
+        assert(t.select(i) == values[i])
+        assert(t[i] == values[i])
+        assert(t[-i-1] == values[-i-1])
+    for key in range(-1, 102):
+        assert(t.rank(key) == sum(1 for v in values if v < key))
+    for lo, hi in [ (0, 100), (10, 20), (20, 10), (50, 50), (-5, 3) ]:
+        assert(t.count_range(lo, hi) == sum(1 for v in values if lo <= v <= hi))
+        assert(t.count_range(lo, hi, (False, False)) == sum(1 for v in values if lo < v < hi))
+    for s in [ slice(None), slice(3, 30), slice(10, 2), slice(None, None, -3), slice(-20, None, 2) ]:
+        assert(t[s] == values[s])
+    try:
+        t.select(len(values))
+        assert(False)
+    except IndexError:
+        pass
+
+
+def test_avltree_order_statistics_bulk():
+    t = AVLTree[int, int](order_statistics=True)
+    t.build_sorted(list(range(0, 100)))
+    _assert_invariants_hold(t)
+    _assert_sizes_hold(t)
+    assert(t[42] == 42)
+    assert(t.rank(42) == 42)
+    rng = random.Random(9)
+    values = [ rng.randrange(0, 500) for _ in range(0, 300) ]
+    t = AVLTree[int, int].from_iterable(values, order_statistics=True)
+    _assert_invariants_hold(t)
+    _assert_sizes_hold(t)
+    expected = sorted(values)
+    for i in range(0, len(expected)):
+        assert(t.select(i) == expected[i])
+    for key in range(-1, 501, 7):
+        assert(t.rank(key) == sum(1 for value in values if value < key))
+    t = AVLTree[str, int].from_sorted([ 'a', 'bb', 'ccc' ], key=len, order_statistics=True)
+    _assert_sizes_hold(t)
+    assert(t.select(1) == 'bb')
+    assert(t.rank(3) == 2)
+
+
+def test_avltree_order_statistics_disabled():
+    t = AVLTree[int, int].from_sorted([ 1, 2, 3 ])
+    try:
+        t.select(0)
+        assert(False)
+    except TypeError:
+        pass
+
+
+def test_avltree_add_near_finger():
+    rng = random.Random(8)
+    t = AVLTree[tuple[int, int], int](key=lambda value: value[0])
+    values = list[tuple[int, int]]()
+    key = 500
+    for i in range(0, 1000):
+        # Mostly small steps away from the previous key, with an occasional jump
+        key = rng.randrange(0, 1000) if rng.random() < 0.05 else max(0, key + rng.randrange(-3, 4))
+        values.append((key, i))
+        t.add((key, i), t.get_finger_hint((key, i)))
+        if i % 50 == 0:
+            t.discard(values[rng.randrange(0, len(values))])
+            values = list(t)
+    _assert_invariants_hold_by_key(t)
+    # Values with equal keys keep their insertion order
+    assert(list(t) == sorted(values, key=lambda value: value[0]))
+
+
+def test_avltree_add_many_sorted():
+    calls = 0
+    def key(value: int) -> int:
+        nonlocal calls
+        calls += 1
+        return value
+    t = AVLTree[int, int](key)
+    n = 20_000
+    t.add_many_sorted(range(0, n))
+    _assert_invariants_hold(t)
+    assert(list(t) == list(range(0, n)))
+    # Appending and prepending attach to the largest or smallest node without
+    # comparing against more than a constant number of nodes
+    assert(calls <= n * 4)
+    calls = 0
+    t.add_many_sorted(range(-1, -1001, -1))
+    assert(calls <= 1000 * 5)
+    # Near-sequential keys inside the tree climb only a few levels, where a
+    # search from the root would compare against about log2(n) = 14 nodes
+    calls = 0
+    values = [ i + 0.5 for i in range(5000, 6000) ]
+    t.add_many_sorted(values)
+    assert(calls <= len(values) * 11)
+    _assert_invariants_hold(t)
+    assert(list(t) == sorted([ *range(-1000, n), *values ]))
+
+
+def test_avltree_finger_policy():
+    calls = 0
+    def key(value: float) -> float:
+        nonlocal calls
+        calls += 1
+        return value
+    t = AVLTree[float, float](key)
+    t.add_many_sorted(range(0, 10_000))
+    t.add_many_sorted([ 5000.5 ])
+    # Lookups far away from the last insert leave the finger alone, so the
+    # next insert next to it does not have to climb up from elsewhere
+    for value in [ 17, 9000, 250 ]:
+        assert(value in t)
+        assert(t.find(value) == value)
+        assert(t.find_node(value) is not None)
+    calls = 0
+    t.add_many_sorted([ 5000.25, 5000.75 ])
+    assert(calls <= 2 * 11)
+    # Removing a node leaves the finger close to it
+    t.discard(7000)
+    calls = 0
+    t.add_many_sorted([ 7000 ])
+    assert(calls <= 11)
+    # Removing the smallest and largest nodes keeps appends and prepends in order
+    t.discard(9999)
+    t.pop_max()
+    t.pop_min()
+    t.discard(1)
+    calls = 0
+    t.add_many_sorted([ 20_000 ])
+    t.add_many_sorted([ -1 ])
+    assert(calls <= 4 + 5)
+    _assert_invariants_hold(t)
+    expected = [ -1, *range(2, 9998), 20_000 ]
+    for value in [ 5000.25, 5000.5, 5000.75 ]:
+        expected.append(value)
+    assert(list(t) == sorted(expected))
+    for value in list(t):
+        t.discard(value)
+    assert(len(t) == 0)
+    t.add_many_sorted([ 2, 1 ])
+    t.add_many_sorted([ 3 ])
+    assert(list(t) == [ 1, 2, 3 ])
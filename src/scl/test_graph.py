@@ -1,5 +1,7 @@
 
-from .graph import Graph, strongconnect
+import pytest
+
+from .graph import CycleError, FrozenGraph, Graph, condensation, itoposort, strongconnect, toposort
 
 def test_graph_mixed_ops():
 
@@ -218,6 +220,57 @@ def test_remove_vertex():
     assert(g.has_vertex(5))
     assert(not g.has_vertex(6))
 
+def test_incoming():
+    g = Graph[int]()
+    g.add_edge(1,2)
+    g.add_edge(2,3)
+    g.add_edge(3,1)
+    g.add_edge(5,3)
+
+    l1 = set(g.get_in_vertices(1))
+    assert(len(l1) == 1)
+    assert(3 in l1)
+
+    l3 = set(g.get_in_vertices(3))
+    assert(len(l3) == 2)
+    assert(2 in l3)
+    assert(5 in l3)
+    assert(g.count_in_edges(3) == 2)
+    assert(g.count_out_edges(3) == 1)
+
+    l4 = set(g.get_in_vertices(5))
+    assert(len(l4) == 0)
+
+    g.remove_edge(5, 3)
+    assert(set(g.get_in_vertices(3)) == { 2 })
+    assert(g.count_in_edges(3) == 1)
+
+def test_remove_vertex_updates_incoming():
+
+    g = Graph[int]()
+    g.add_edge(1,1)
+    g.add_edge(1,2)
+    g.add_edge(2,1)
+    g.add_edge(2,3)
+    g.add_edge(3,2)
+
+    g.remove_vertex(1)
+
+    assert(g.count_vertices() == 2)
+    assert(g.count_edges() == 2)
+    assert(set(g.get_in_vertices(2)) == { 3 })
+    assert(set(g.get_out_vertices(2)) == { 3 })
+    assert(not g.has_edge(2, 1))
+    assert(g.count_in_edges(1) == 0)
+    assert(g.count_out_edges(1) == 0)
+
+    g.remove_vertex(2)
+
+    assert(g.count_vertices() == 1)
+    assert(g.count_edges() == 0)
+    assert(g.count_in_edges(3) == 0)
+    assert(g.count_out_edges(3) == 0)
+
 def test_strongconnect_0():
     g = Graph[int]()
     g.add_edge(1, 2)
@@ -261,3 +314,136 @@ def test_strongconnect_2():
     assert(6 in res[0])
     assert(len(res[1]) == 1)
     assert(7 in res[1])
+
+def test_strongconnect_long_chain():
+    n = 50000
+    g = Graph[int]()
+    for i in range(0, n-1):
+        g.add_edge(i, i+1)
+    res = list(strongconnect(g))
+    assert(len(res) == n)
+    assert(all(len(scc) == 1 for scc in res))
+    g.add_edge(n-1, 0)
+    res = list(strongconnect(g))
+    assert(len(res) == 1)
+    assert(len(res[0]) == n)
+
+def test_strongconnect_reverse_topological():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(2, 1)
+    g.add_edge(2, 3)
+    g.add_edge(3, 4)
+    g.add_edge(4, 3)
+    g.add_edge(1, 5)
+    res = list(strongconnect(g))
+    pos = dict[int, int]()
+    for i, scc in enumerate(res):
+        for v in scc:
+            pos[v] = i
+    for src in g.vertices:
+        for dst in g.get_out_vertices(src):
+            assert(pos[dst] <= pos[src])
+
+def test_freeze():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(2, 3)
+    g.add_edge(3, 1)
+    g.add_edge(3, 5)
+    g.add_edge(5, 5)
+    g.add_vertex(6)
+    f = g.freeze()
+    assert(isinstance(f, FrozenGraph))
+    assert(f.count_vertices() == 5)
+    assert(f.count_edges() == 5)
+    assert(f.has_vertex(6))
+    assert(not f.has_vertex(4))
+    for src in g.vertices:
+        assert(set(f.get_out_vertices(src)) == set(g.get_out_vertices(src)))
+        assert(set(f.get_in_vertices(src)) == set(g.get_in_vertices(src)))
+        assert(f.count_out_edges(src) == g.count_out_edges(src))
+        assert(f.count_in_edges(src) == g.count_in_edges(src))
+        for dst in g.vertices:
+            assert(f.has_edge(src, dst) == g.has_edge(src, dst))
+    assert(not f.has_edge(1, 4))
+    assert(list(f.get_out_vertices(4)) == [])
+    assert(f.count_in_edges(4) == 0)
+
+def test_strongconnect_frozen():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(2, 3)
+    g.add_edge(3, 1)
+    g.add_edge(3, 4)
+    g.add_edge(4, 5)
+    g.add_edge(5, 1)
+    g.add_edge(5, 6)
+    g.add_edge(6, 2)
+    g.add_edge(6, 7)
+    expected = sorted(tuple(sorted(scc)) for scc in strongconnect(g))
+    actual = sorted(tuple(sorted(scc)) for scc in strongconnect(g.freeze()))
+    assert(actual == expected)
+    n = 50000
+    g = Graph[int]()
+    for i in range(0, n-1):
+        g.add_edge(i, i+1)
+    assert(len(list(strongconnect(g.freeze()))) == n)
+    g.add_edge(n-1, 0)
+    assert(len(list(strongconnect(g.freeze()))) == 1)
+
+def test_toposort():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(1, 3)
+    g.add_edge(2, 4)
+    g.add_edge(3, 4)
+    g.add_edge(4, 5)
+    g.add_vertex(6)
+    for h in [ g, g.freeze() ]:
+        order = toposort(h)
+        assert(sorted(order) == [ 1, 2, 3, 4, 5, 6 ])
+        pos = { v: i for i, v in enumerate(order) }
+        for src in g.vertices:
+            for dst in g.get_out_vertices(src):
+                assert(pos[src] < pos[dst])
+
+def test_toposort_cycle():
+    g = Graph[int]()
+    g.add_edge(0, 1)
+    g.add_edge(1, 2)
+    g.add_edge(2, 3)
+    g.add_edge(3, 2)
+    for h in [ g, g.freeze() ]:
+        it = itoposort(h)
+        assert(next(it) == 0)
+        assert(next(it) == 1)
+        with pytest.raises(CycleError):
+            next(it)
+        with pytest.raises(CycleError):
+            toposort(h)
+
+def test_condensation():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(2, 1)
+    g.add_edge(2, 3)
+    g.add_edge(3, 4)
+    g.add_edge(4, 3)
+    g.add_edge(4, 5)
+    g.add_edge(1, 5)
+    g.add_edge(5, 5)
+    for h in [ g, g.freeze() ]:
+        c = condensation(h)
+        assert(sorted(sorted(scc) for scc in c.components) == [ [ 1, 2 ], [ 3, 4 ], [ 5 ] ])
+        assert(c.graph.count_vertices() == 3)
+        assert(c.graph.count_edges() == 3)
+        a = c.component_of[1]
+        b = c.component_of[3]
+        d = c.component_of[5]
+        assert(c.graph.has_edge(a, b))
+        assert(c.graph.has_edge(b, d))
+        assert(c.graph.has_edge(a, d))
+        for src in c.graph.vertices:
+            for dst in c.graph.get_out_vertices(src):
+                assert(dst < src)
@@ -0,0 +1,59 @@
+
+import random
+
+import pytest
+
+from . import intervalarray
+from .intervalarray import IntervalArray
+from .intervaltree import Interval, IntervalTree
+
+
+@pytest.fixture(params=[ 'numpy', 'array' ])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        if intervalarray.np is None:
+            pytest.skip('NumPy is not installed')
+    else:
+        monkeypatch.setattr(intervalarray, 'np', None)
+    return request.param
+
+
+def test_intervalarray_matches_intervaltree(backend, random_intervals):
+    intervals = random_intervals(700, 3)
+    a = IntervalArray(intervals, block_size=16)
+    t = IntervalTree(intervals)
+    assert(len(a) == 700)
+    assert(sorted(a, key=lambda i: i.data) == intervals)
+    rng = random.Random(4)
+    queries = list[Interval[int]]()
+    for _ in range(0, 200):
+        start = rng.randrange(-50, 1400)
+        queries.append(Interval(start, start + rng.choice([ 0, 2, 30, 400 ])))
+    results = a.overlapping_many(queries)
+    for q, result in zip(queries, results):
+        assert(sorted(result, key=lambda i: i.data) == sorted(t.overlapping(q), key=lambda i: i.data))
+        assert([ i.start for i in result ] == sorted(i.start for i in result))
+        assert(a.count_overlapping(q) == len(result))
+        assert(list(a.overlapping(q)) == result)
+    points = [ rng.randrange(-50, 1400) for _ in range(0, 200) ]
+    for p, result in zip(points, a.stab_many(points)):
+        assert(sorted(result, key=lambda i: i.data) == sorted(t.overlap_point(p), key=lambda i: i.data))
+        assert(list(a.overlap_point(p)) == result)
+
+
+def test_intervalarray_from_arrays(backend):
+    a = IntervalArray.from_arrays([ 5, 1, 3 ], [ 6, 2, 10 ])
+    assert(list(a) == [ Interval(1, 2), Interval(3, 10), Interval(5, 6) ])
+    assert(list(a.overlap_point(5)) == [ Interval(3, 10), Interval(5, 6) ])
+    queries, intervals = a.query([ 0, 7 ], [ 1, 8 ])
+    assert(list(queries) == [ 0, 1 ])
+    assert(list(intervals) == [ 0, 1 ])
+    with pytest.raises(ValueError):
+        IntervalArray.from_arrays([ 1 ], [ 2, 3 ])
+
+
+def test_intervalarray_empty(backend):
+    a = IntervalArray[int, None]()
+    assert(len(a) == 0)
+    assert(list(a.overlap_point(1)) == [])
+    assert(a.stab_many([ 1, 2 ]) == [ [], [] ])
@@ -1,5 +1,5 @@
 
-from .intervallist import Interval, IntervalList
+from .intervallist import Interval, IntervalList, RangeSet
 
 def _assert_invariants_hold(l: IntervalList) -> None:
     if l._elements:
@@ -47,6 +47,214 @@ def test_intervallist_overlap():
     assert(len(o2) == 2)
     assert(i2 in o2)
     assert(i5 in o2)
-    o3 = l.overlap_point(2)
+    o3 = l.overlap_point(3)
     assert(len(o3) == 0)
 
+
+
+def test_intervallist_overlap_point_random():
+    import random
+    rng = random.Random(5)
+    intervals = list[Interval[int]]()
+    for _ in range(0, 300):
+        start = rng.randrange(0, 500)
+        intervals.append(Interval(start, start + rng.choice([ 1, 2, 10, 200 ])))
+    l = IntervalList[int](intervals)
+    _assert_invariants_hold(l)
+    for p in range(-5, 720, 3):
+        assert(l.overlap_point(p) == set(i for i in intervals if i.start <= p < i.stop))
+
+
+def test_intervallist_stab_many():
+    import random
+    rng = random.Random(6)
+    intervals = list[Interval[int]]()
+    for _ in range(0, 300):
+        start = rng.randrange(0, 500)
+        intervals.append(Interval(start, start + rng.choice([ 1, 2, 10, 200 ])))
+    l = IntervalList[int](intervals)
+    points = [ rng.randrange(-5, 720) for _ in range(0, 200) ]
+    assert(l.stab_many(points) == [ l.overlap_point(p) for p in points ])
+    assert(l.stab_many(sorted(points)) == [ l.overlap_point(p) for p in sorted(points) ])
+    assert(IntervalList[int]().stab_many(points) == [ set() for _ in points ])
+
+
+def test_intervallist_within():
+    l = IntervalList[int]()
+    l.addi(0, 10)
+    l.addi(2, 4)
+    l.addi(5, 20)
+    l.addi(30, 40)
+    assert(Interval(0, 20) in l)
+    assert(Interval(3, 15) in l)
+    assert(Interval(19, 20) in l)
+    assert(Interval(19, 21) not in l)
+    assert(Interval(15, 35) not in l)
+    assert(Interval(30, 40) in l)
+    assert(Interval(-1, 5) not in l)
+    assert(Interval(40, 41) not in l)
+
+
+def test_intervallist_discard():
+    l = IntervalList[int]()
+    l.addi(1, 5)
+    l.addi(2, 3)
+    l.addi(4, 10)
+    assert(Interval(1, 10) in l)
+    l.discard(Interval(4, 10))
+    _assert_invariants_hold(l)
+    assert(len(l) == 2)
+    assert(Interval(1, 10) not in l)
+    assert(l.overlap_point(4) == { Interval(1, 5) })
+    l.discard(Interval(4, 10))
+    assert(len(l) == 2)
+    l.remove(Interval(1, 5))
+    assert(list(l) == [ Interval(2, 3) ])
+
+
+def test_intervallist_update():
+    import random
+    rng = random.Random(9)
+    first = [ Interval(rng.randrange(0, 100), 100 + rng.randrange(0, 100)) for _ in range(0, 200) ]
+    second = [ Interval(rng.randrange(0, 100), 100 + rng.randrange(0, 100)) for _ in range(0, 200) ]
+    l = IntervalList[int](first)
+    _assert_invariants_hold(l)
+    l.update(second)
+    _assert_invariants_hold(l)
+    assert(list(l) == sorted(first + second))
+    l.update([])
+    assert(len(l) == 400)
+    l.add(Interval(50, 51))
+    _assert_invariants_hold(l)
+    assert(l.overlap_point(50) == set(i for i in first + second + [ Interval(50, 51) ] if i.start <= 50 < i.stop))
+
+
+def _points(l: IntervalList[int]) -> set[int]:
+    return set(p for interval in l for p in range(interval.start, interval.stop))
+
+
+def _assert_coalesced(l: RangeSet[int]) -> None:
+    _assert_invariants_hold(l)
+    for interval in l:
+        assert(interval.start < interval.stop)
+    for a, b in zip(l._elements, l._elements[1:]):
+        assert(a.stop < b.start)
+
+
+def test_rangeset_add_discard():
+    import random
+    rng = random.Random(17)
+    s = RangeSet[int]()
+    expected = set[int]()
+    for _ in range(0, 500):
+        start = rng.randrange(0, 200)
+        stop = start + rng.randrange(0, 15)
+        if rng.random() < 0.6:
+            s.add(Interval(start, stop))
+            expected |= set(range(start, stop))
+        else:
+            s.discard(Interval(start, stop))
+            expected -= set(range(start, stop))
+        _assert_coalesced(s)
+        assert(_points(s) == expected)
+    for p in range(-2, 220):
+        assert((p in s) == (p in expected))
+
+
+def test_rangeset_merges_adjacent():
+    s = RangeSet[int]([ Interval(5, 10), Interval(0, 5), Interval(12, 14), Interval(13, 20) ])
+    assert(list(s) == [ Interval(0, 10), Interval(12, 20) ])
+    s.add(Interval(10, 12))
+    assert(list(s) == [ Interval(0, 20) ])
+    assert(Interval(3, 17) in s)
+    s.remove(Interval(3, 17))
+    assert(list(s) == [ Interval(0, 3), Interval(17, 20) ])
+    assert(Interval(2, 18) not in s)
+    assert(3 not in s)
+    assert(2 in s)
+    try:
+        s.remove(Interval(2, 18))
+        assert(False)
+    except KeyError:
+        pass
+
+
+def test_rangeset_algebra():
+    import random
+    rng = random.Random(23)
+    def make() -> RangeSet[int]:
+        s = RangeSet[int]()
+        for _ in range(0, 20):
+            start = rng.randrange(0, 100)
+            s.add(Interval(start, start + rng.randrange(1, 10)))
+        return s
+    for _ in range(0, 50):
+        a = make()
+        b = make()
+        for result, expected in [
+            (a | b, _points(a) | _points(b)),
+            (a & b, _points(a) & _points(b)),
+            (a - b, _points(a) - _points(b)),
+            (a ^ b, _points(a) ^ _points(b)),
+        ]:
+            assert(isinstance(result, RangeSet))
+            _assert_coalesced(result)
+            assert(_points(result) == expected)
+        assert((a & b) <= a)
+        assert(a <= (a | b))
+        assert(a.isdisjoint(b) == (not (_points(a) & _points(b))))
+    assert(RangeSet([ Interval(0, 5), Interval(6, 10) ]) <= RangeSet([ Interval(0, 10) ]))
+    assert(RangeSet([ Interval(0, 10) ]) == RangeSet([ Interval(0, 4), Interval(4, 10) ]))
+
+
+def test_rangeset_inplace_algebra():
+    import operator
+    import random
+    rng = random.Random(24)
+    def make() -> RangeSet[int]:
+        s = RangeSet[int]()
+        for _ in range(0, 20):
+            start = rng.randrange(0, 100)
+            s.add(Interval(start, start + rng.randrange(1, 10)))
+        return s
+    pairs = [ (RangeSet([ Interval(19, 23) ]), RangeSet([ Interval(15, 21) ])) ]
+    pairs.extend((make(), make()) for _ in range(0, 50))
+    for a, b in pairs:
+        for inplace, binary in [
+            (operator.ior, operator.or_),
+            (operator.iand, operator.and_),
+            (operator.isub, operator.sub),
+            (operator.ixor, operator.xor),
+        ]:
+            expected = binary(a, b)
+            c = RangeSet(a)
+            result = inplace(c, b)
+            assert(result is c)
+            _assert_coalesced(c)
+            assert(c == expected)
+    a = RangeSet([ Interval(19, 23) ])
+    a ^= RangeSet([ Interval(15, 21) ])
+    assert(list(a) == [ Interval(15, 19), Interval(21, 23) ])
+
+
+def test_rangeset_reflected_algebra():
+    a = { Interval(5, 20) }
+    b = RangeSet([ Interval(0, 10) ])
+    assert(a - b == RangeSet([ Interval(5, 20) ]) - b == RangeSet([ Interval(10, 20) ]))
+    assert(a & b == RangeSet([ Interval(5, 10) ]))
+    assert(a ^ b == RangeSet([ Interval(0, 5), Interval(10, 20) ]))
+    assert(a | b == RangeSet([ Interval(0, 20) ]))
+    for result in [ a - b, a & b, a ^ b, a | b ]:
+        assert(isinstance(result, RangeSet))
+
+
+def test_rangeset_contains_foreign():
+    s = RangeSet([ Interval(0, 10) ])
+    assert('x' not in s)
+    assert(None not in s)
+    assert(Interval('a', 'b') not in s)
+    assert(5 in s)
+
+
+def test_interval_is_slotted():
+    assert(not hasattr(Interval(1, 2), '__dict__'))
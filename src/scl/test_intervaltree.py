@@ -1,4 +1,6 @@
 
+import pytest
+
 from .intervaltree import Interval, IntervalTree
 
 
@@ -75,3 +77,176 @@ def test_intervaltree_add_contains():
     assert(Interval(3,4) in t1)
     assert(Interval(3,5) not in t1)
 
+
+
+def _assert_invariants_hold(t: IntervalTree) -> None:
+    count = 0
+    def visit(node) -> tuple[int, int]:
+        nonlocal count
+        count += 1
+        expected = node.value.stop
+        heights = []
+        for child in [ node.left, node.right ]:
+            if child is None:
+                heights.append(0)
+                continue
+            assert(child.parent is node)
+            child_max, child_height = visit(child)
+            expected = max(expected, child_max)
+            heights.append(child_height)
+        if node.left is not None:
+            assert(node.left.value.start <= node.value.start)
+        if node.right is not None:
+            assert(node.right.value.start >= node.value.start)
+        assert(node.max == expected)
+        assert(node.balance == heights[1] - heights[0])
+        assert(abs(node.balance) <= 1)
+        return expected, max(heights) + 1
+    if t._root is not None:
+        assert(t._root.parent is None)
+        visit(t._root)
+    assert(count == len(t))
+
+
+def _height(t: IntervalTree) -> int:
+    def visit(node) -> int:
+        if node is None:
+            return 0
+        return max(visit(node.left), visit(node.right)) + 1
+    return visit(t._root)
+
+
+def test_intervaltree_sorted_insert_stays_balanced():
+    t = IntervalTree[int]()
+    n = 4096
+    for i in range(0, n):
+        t.addi(i, i + 10)
+    _assert_invariants_hold(t)
+    assert(_height(t) <= 1.45 * 12 + 1)
+    for i in range(0, n, 2):
+        t.discard(Interval(i, i + 10))
+    _assert_invariants_hold(t)
+    assert(len(t) == n // 2)
+    assert(_height(t) <= 1.45 * 11 + 1)
+
+
+def test_intervaltree_discard():
+    import random
+    rng = random.Random(42)
+    intervals = list[Interval[int]]()
+    for _ in range(0, 300):
+        start = rng.randrange(0, 1000)
+        intervals.append(Interval(start, start + rng.randrange(0, 100)))
+    t = IntervalTree[int](intervals)
+    _assert_invariants_hold(t)
+    rng.shuffle(intervals)
+    for i, interval in enumerate(intervals):
+        assert(interval in t)
+        t.discard(interval)
+        _assert_invariants_hold(t)
+        assert(len(t) == len(intervals) - i - 1)
+        for other in intervals[i+1:i+5]:
+            assert(other in t)
+    assert(len(t) == 0)
+    t.discard(Interval(1, 2))
+    assert(len(t) == 0)
+
+
+def test_intervaltree_discard_duplicates():
+    t = IntervalTree[int]()
+    t.addi(1, 2)
+    t.addi(1, 2)
+    t.addi(0, 2)
+    assert(len(t) == 3)
+    t.discard(Interval(1, 2))
+    assert(len(t) == 2)
+    assert(Interval(1, 2) in t)
+    assert(Interval(0, 2) in t)
+    t.discard(Interval(1, 2))
+    assert(Interval(1, 2) not in t)
+    assert(Interval(0, 2) in t)
+    _assert_invariants_hold(t)
+
+
+def test_intervaltree_from_sorted():
+    intervals = [ Interval(i, i + (i % 7)) for i in range(0, 1000) ]
+    t = IntervalTree[int].from_sorted(intervals)
+    _assert_invariants_hold(t)
+    assert(len(t) == 1000)
+    for interval in intervals:
+        assert(interval in t)
+    t.addi(500, 2000)
+    t.discard(Interval(3, 6))
+    _assert_invariants_hold(t)
+    assert(t._root is not None and t._root.max == 2000)
+
+
+def test_intervaltree_from_iterable():
+    intervals = [ Interval((i * 37) % 1000, (i * 37) % 1000 + (i % 7)) for i in range(0, 1000) ]
+    t = IntervalTree[int].from_iterable(intervals)
+    _assert_invariants_hold(t)
+    assert(sorted(t, key=lambda interval: interval.start) == list(t))
+    assert(set(t.overlap_point(500)) == set(i for i in intervals if i.start <= 500 <= i.stop))
+    with pytest.raises(TypeError):
+        IntervalTree[int].from_iterable(intervals, key='stop')
+
+
+def test_intervaltree_overlapping(random_intervals):
+    intervals = random_intervals(500, 7)
+    t = IntervalTree[int, int]()
+    for interval in intervals:
+        t.add(interval)
+    for lo in range(-10, 1100, 37):
+        for size in [ 0, 1, 10, 100 ]:
+            q = Interval(lo, lo + size)
+            expected = sorted((i.start, i.stop) for i in intervals if Interval.overlaps(i, q))
+            actual = [ (i.start, i.stop) for i in t.overlapping(q) ]
+            assert(sorted(actual) == expected)
+            assert([ start for start, _ in actual ] == sorted(start for start, _ in actual))
+            assert(t.count_overlapping(q) == len(expected))
+            expected = sorted((i.start, i.stop) for i in intervals if i.start >= q.start and i.stop <= q.stop)
+            assert(sorted((i.start, i.stop) for i in t.envelop(q)) == expected)
+        expected = sorted((i.start, i.stop) for i in intervals if i.start <= lo <= i.stop)
+        assert(sorted((i.start, i.stop) for i in t.overlap_point(lo)) == expected)
+
+
+def test_intervaltree_overlapping_later_intervals():
+    t = IntervalTree[int]()
+    t.addi(0, 100)
+    t.addi(1, 2)
+    t.addi(3, 50)
+    t.addi(60, 70)
+    assert(list(t.overlap_point(65)) == [ Interval(0, 100), Interval(60, 70) ])
+    assert(list(t.overlap_point(2)) == [ Interval(0, 100), Interval(1, 2) ])
+    assert(list(t.overlapping(Interval(200, 300))) == [])
+    assert(t.count_overlapping(Interval(40, 60)) == 3)
+    assert(list(t.envelop(Interval(1, 60))) == [ Interval(1, 2), Interval(3, 50) ])
+
+
+def test_intervaltree_overlapping_many(random_intervals):
+    import random
+    rng = random.Random(11)
+    intervals = random_intervals(400, 13)
+    t = IntervalTree[int, int](intervals)
+    queries = list[Interval[int]]()
+    for _ in range(0, 300):
+        start = rng.randrange(-50, 1100)
+        queries.append(Interval(start, start + rng.choice([ 0, 3, 40, 500 ])))
+    results = t.overlapping_many(queries)
+    assert(len(results) == len(queries))
+    for q, result in zip(queries, results):
+        assert(result == list(t.overlapping(q)))
+    points = [ rng.randrange(-50, 1100) for _ in range(0, 300) ]
+    results = t.stab_many(points)
+    for p, result in zip(points, results):
+        assert(result == list(t.overlap_point(p)))
+    assert(IntervalTree[int]().stab_many([ 1, 2 ]) == [ [], [] ])
+    assert(t.overlapping_many([]) == [])
+
+
+def test_intervaltree_nodes_are_slotted():
+    t = IntervalTree[int]()
+    t.addi(1, 2)
+    assert(t._root is not None)
+    assert(not hasattr(t._root, '__dict__'))
+    assert(not hasattr(t._root.value, '__dict__'))
@@ -0,0 +1,116 @@
+
+import random
+
+import pytest
+
+from .intervallist import Interval
+from .persistentavltree import PersistentAVLTree
+
+
+def _assert_invariants_hold(t: PersistentAVLTree) -> None:
+    count = 0
+    def visit(node) -> int:
+        nonlocal count
+        if node is None:
+            return 0
+        count += 1
+        if node.left is not None:
+            assert(node.left.value <= node.value)
+        if node.right is not None:
+            assert(node.right.value >= node.value)
+        left_height = visit(node.left)
+        right_height = visit(node.right)
+        assert(abs(right_height - left_height) <= 1)
+        assert(node.height == max(left_height, right_height) + 1)
+        return node.height
+    visit(t._root)
+    assert(count == len(t))
+
+
+def test_persistentavltree_add():
+    rng = random.Random(1)
+    t = PersistentAVLTree[int, int]()
+    values = [ rng.randrange(0, 100) for _ in range(0, 500) ]
+    for value in values:
+        t = t.add(value)
+        _assert_invariants_hold(t)
+    assert(list(t) == sorted(values))
+
+
+def test_persistentavltree_snapshots():
+    rng = random.Random(2)
+    values = [ rng.randrange(0, 1000) for _ in range(0, 300) ]
+    versions = [ PersistentAVLTree[int, int]() ]
+    for value in values:
+        versions.append(versions[-1].add(value))
+    for i, version in enumerate(versions):
+        assert(list(version) == sorted(values[:i]))
+    removed = versions[-1]
+    for value in values[:150]:
+        removed = removed.remove(value)
+    assert(list(removed) == sorted(values[150:]))
+    assert(list(versions[-1]) == sorted(values))
+
+
+def test_persistentavltree_shares_nodes():
+    t = PersistentAVLTree(range(0, 1024))
+    u = t.add(2000)
+    def collect(node, out) -> None:
+        if node is not None:
+            out.add(id(node))
+            collect(node.left, out)
+            collect(node.right, out)
+    t_nodes = set[int]()
+    u_nodes = set[int]()
+    collect(t._root, t_nodes)
+    collect(u._root, u_nodes)
+    assert(len(u_nodes - t_nodes) <= u._root.height + 1)
+
+
+def test_persistentavltree_remove():
+    rng = random.Random(3)
+    values = [ rng.randrange(0, 50) for _ in range(0, 300) ]
+    t = PersistentAVLTree(values)
+    expected = sorted(values)
+    rng.shuffle(values)
+    for value in values:
+        assert(value in t)
+        t = t.remove(value)
+        expected.remove(value)
+        _assert_invariants_hold(t)
+        assert(list(t) == expected)
+    assert(t.discard(1) is t)
+    with pytest.raises(ValueError):
+        t.remove(1)
+
+
+def test_persistentavltree_key():
+    rng = random.Random(4)
+    values = [ (rng.randrange(0, 10), i) for i in range(0, 200) ]
+    t = PersistentAVLTree(key=lambda value: value[0])
+    for value in values:
+        t = t.add(value)
+    assert(list(t) == sorted(values, key=lambda value: value[0]))
+    for value in values[::2]:
+        t = t.remove(value)
+        assert(value not in t)
+    assert(list(t) == sorted(values[1::2], key=lambda value: value[0]))
+    assert(t.find(3) == next(value for value in values[1::2] if value[0] == 3))
+    t = PersistentAVLTree([ Interval(start, start + 1) for start in [ 5, 1, 3 ] ], key='start')
+    assert([ interval.start for interval in t ] == [ 1, 3, 5 ])
+    assert(t.find(3) == Interval(3, 4))
+
+
+def test_persistentavltree_irange():
+    rng = random.Random(5)
+    values = sorted(rng.randrange(0, 100) for _ in range(0, 400))
+    t = PersistentAVLTree(values)
+    assert(t.min() == values[0])
+    assert(t.max() == values[-1])
+    for _ in range(0, 200):
+        lo = rng.randrange(-10, 110)
+        hi = rng.randrange(-10, 110)
+        assert(list(t.irange(lo, hi)) == [ v for v in values if lo <= v <= hi ])
+        assert(list(t.irange(lo, hi, (False, False))) == [ v for v in values if lo < v < hi ])
+        assert(list(t.irange(lo)) == [ v for v in values if lo <= v ])
+        assert(list(t.irange(hi=hi)) == [ v for v in values if v <= hi ])
@@ -0,0 +1,101 @@
+
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from .graph import Graph
+from .scheduler import schedule
+
+
+def _square(v: int) -> int:
+    return v * v
+
+
+def test_schedule_respects_dependencies():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(1, 3)
+    g.add_edge(2, 4)
+    g.add_edge(3, 4)
+    g.add_vertex(5)
+    lock = threading.Lock()
+    finished = set[int]()
+    def run(v: int) -> int:
+        with lock:
+            for u in g.get_in_vertices(v):
+                assert(u in finished)
+        time.sleep(0.001)
+        with lock:
+            finished.add(v)
+        return v * 10
+    res = schedule(g, run, max_workers=4)
+    assert(finished == { 1, 2, 3, 4, 5 })
+    assert(res.results == { 1: 10, 2: 20, 3: 30, 4: 40, 5: 50 })
+    assert(set(res.durations) == { 1, 2, 3, 4, 5 })
+    assert(res.critical_path[0] == 1)
+    assert(res.critical_path[-1] == 4)
+    assert(len(res.critical_path) == 3)
+    assert(res.critical_path_length <= res.busy_time)
+    assert(res.idle_time is not None and res.idle_time >= 0)
+
+
+def test_schedule_releases_without_level_barrier():
+    # 1 -> 2 is slow, 3 -> 4 -> 5 is fast; 4 and 5 must not wait for 2.
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(3, 4)
+    g.add_edge(4, 5)
+    order = list[int]()
+    lock = threading.Lock()
+    def run(v: int) -> None:
+        if v == 2:
+            time.sleep(0.2)
+        with lock:
+            order.append(v)
+    schedule(g, run, max_workers=2)
+    assert(order.index(5) < order.index(2))
+
+
+def test_schedule_cycle_runs_in_one_task():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(2, 1)
+    g.add_edge(2, 3)
+    res = schedule(g, _square, max_workers=2)
+    assert(res.results == { 1: 1, 2: 4, 3: 9 })
+    assert(sorted(res.critical_path) == [ 1, 2, 3 ])
+    assert(res.critical_path[-1] == 3)
+
+
+def test_schedule_propagates_errors():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    def run(v: int) -> None:
+        raise RuntimeError(v)
+    with pytest.raises(RuntimeError):
+        schedule(g, run)
+
+
+def test_schedule_process_pool():
+    g = Graph[int]()
+    g.add_edge(1, 2)
+    g.add_edge(2, 3)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        res = schedule(g, _square, executor=executor)
+        counted = schedule(g, _square, executor=executor, max_workers=2)
+    assert(res.results == { 1: 1, 2: 4, 3: 9 })
+    assert(res.critical_path == [ 1, 2, 3 ])
+    # The number of workers of a foreign executor is not guessed
+    assert(res.idle_time is None)
+    assert(counted.results == res.results)
+    assert(counted.idle_time is not None and counted.idle_time >= 0)
+
+
+def test_schedule_empty():
+    res = schedule(Graph[int](), _square)
+    assert(res.results == {})
+    assert(res.idle_time is not None)
+    assert(res.critical_path == [])
+    assert(res.critical_path_length == 0)
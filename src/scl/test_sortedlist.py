@@ -0,0 +1,145 @@
+
+import random
+
+import pytest
+
+from .sortedlist import SortedDict, SortedList
+
+
+def _assert_invariants_hold(l: SortedList) -> None:
+    assert(len(l._lists) == len(l._maxes))
+    for values, keys, max_key in zip(l._lists, l._keys, l._maxes):
+        assert(values)
+        assert(len(values) <= 2 * l._load)
+        assert(len(keys) == len(values))
+        assert(keys == sorted(keys))
+        assert(keys[-1] == max_key)
+    assert(l._maxes == sorted(l._maxes))
+    assert(sum(len(values) for values in l._lists) == len(l))
+
+
+def test_sortedlist_add():
+    rng = random.Random(1)
+    l = SortedList[int](load=4)
+    values = [ rng.randrange(0, 100) for _ in range(0, 500) ]
+    for value in values:
+        l.add(value)
+        _assert_invariants_hold(l)
+    assert(list(l) == sorted(values))
+    assert(list(reversed(l)) == sorted(values, reverse=True))
+
+
+def test_sortedlist_update():
+    rng = random.Random(2)
+    values = [ rng.randrange(0, 1000) for _ in range(0, 1000) ]
+    l = SortedList(values[:500], load=16)
+    l.update(values[500:])
+    _assert_invariants_hold(l)
+    assert(list(l) == sorted(values))
+
+
+def test_sortedlist_key():
+    rng = random.Random(3)
+    values = [ (rng.randrange(0, 20), i) for i in range(0, 200) ]
+    l = SortedList(key=lambda value: value[0], load=4)
+    for value in values:
+        l.add(value)
+    _assert_invariants_hold(l)
+    # Values with equal keys keep their insertion order
+    assert(list(l) == sorted(values, key=lambda value: value[0]))
+    for value in values[::3]:
+        assert(value in l)
+        l.remove(value)
+        assert(value not in l)
+        _assert_invariants_hold(l)
+    assert(list(l) == sorted((value for i, value in enumerate(values) if i % 3), key=lambda value: value[0]))
+
+
+def test_sortedlist_discard():
+    rng = random.Random(4)
+    values = [ rng.randrange(0, 50) for _ in range(0, 300) ]
+    l = SortedList(values, load=4)
+    expected = sorted(values)
+    rng.shuffle(values)
+    for value in values:
+        l.discard(value)
+        expected.remove(value)
+        _assert_invariants_hold(l)
+        assert(list(l) == expected)
+    l.discard(1)
+    with pytest.raises(ValueError):
+        l.remove(1)
+
+
+def test_sortedlist_merges_chunks():
+    rng = random.Random(9)
+    l = SortedList[int](load=8)
+    for _ in range(0, 2000):
+        l.add(rng.randrange(0, 10_000))
+    assert(len(l._lists) >= 2000 // 16)
+    values = list(l)
+    rng.shuffle(values)
+    for value in values[:1950]:
+        l.remove(value)
+        _assert_invariants_hold(l)
+        # Every chunk but at most one holds at least half the load
+        assert(len(l._lists) <= len(l) // (l._load // 2) + 1)
+    assert(list(l) == sorted(values[1950:]))
+    for value in values[1950:]:
+        l.remove(value)
+    assert(l._lists == [])
+    assert(l._maxes == [])
+
+
+def test_sortedlist_index():
+    rng = random.Random(5)
+    values = sorted(rng.randrange(0, 1000) for _ in range(0, 300))
+    l = SortedList(values, load=8)
+    for i in range(-len(values), len(values)):
+        assert(l[i] == values[i])
+    assert(l[10:100] == values[10:100])
+    assert(l[::7] == values[::7])
+    assert(l[200:10] == [])
+    with pytest.raises(IndexError):
+        l[len(values)]
+    assert(l.pop() == values.pop())
+    assert(l.pop(0) == values.pop(0))
+    assert(l.pop(100) == values.pop(100))
+    assert(list(l) == values)
+
+
+def test_sortedlist_irange():
+    rng = random.Random(6)
+    values = sorted(rng.randrange(0, 100) for _ in range(0, 400))
+    l = SortedList(values, load=8)
+    for _ in range(0, 200):
+        lo = rng.randrange(-10, 110)
+        hi = rng.randrange(-10, 110)
+        assert(l.bisect_left(lo) == sum(1 for v in values if v < lo))
+        assert(l.bisect_right(lo) == sum(1 for v in values if v <= lo))
+        assert(list(l.irange(lo, hi)) == [ v for v in values if lo <= v <= hi ])
+        assert(list(l.irange(lo, hi, (False, False))) == [ v for v in values if lo < v < hi ])
+        assert(list(l.irange(lo)) == [ v for v in values if lo <= v ])
+        assert(list(l.irange(hi=hi)) == [ v for v in values if v <= hi ])
+
+
+def test_sorteddict():
+    rng = random.Random(7)
+    d = SortedDict[int, str]()
+    expected = dict[int, str]()
+    for _ in range(0, 500):
+        k = rng.randrange(0, 100)
+        if rng.random() < 0.3 and k in expected:
+            del d[k]
+            del expected[k]
+        else:
+            d[k] = str(k)
+            expected[k] = str(k)
+        assert(list(d) == sorted(expected))
+    assert(len(d) == len(expected))
+    assert(list(d.items()) == sorted(expected.items()))
+    assert(list(d.irange(10, 20)) == [ k for k in sorted(expected) if 10 <= k <= 20 ])
+    assert(d.peekitem(0) == min(expected.items()))
+    assert(d.popitem() == max(expected.items()))
+    with pytest.raises(KeyError):
+        SortedDict().popitem()
@@ -1,5 +1,13 @@
 
-from .util import binary_search_right
+
+import math
+import random
+
+from .intervallist import Interval
+from .util import (
+    adaptivesort, binary_search, binary_search_left, binary_search_right, gallop_left, gallop_right,
+    insertionsort, search_sorted_many, sort_inserted, sort_inserted_many
+)
 
 
 def test_binary_search_nearest():
@@ -10,3 +18,118 @@ def test_binary_search_nearest():
     assert(binary_search_right(l, 3) == 3)
     assert(binary_search_right(l, 4) == 3)
     # assert(binary_search_nearest(l, 4) == 2)
+
+
+def test_binary_search_key():
+    rng = random.Random(1)
+    values = sorted((rng.randrange(0, 50), i) for i in range(0, 200))
+    elements = [ Interval(start, start + 1) for start, _ in values ]
+    starts = [ element.start for element in elements ]
+    for needle in range(-1, 52):
+        expected_left = sum(1 for start in starts if start < needle)
+        expected_right = sum(1 for start in starts if start <= needle)
+        assert(binary_search_left(elements, needle, key='start') == expected_left)
+        assert(binary_search_left(elements, needle, key=lambda element: element.start) == expected_left)
+        assert(binary_search_left(elements, needle, keys=starts) == expected_left)
+        assert(binary_search_left(starts, needle) == expected_left)
+        assert(binary_search_right(elements, needle, key='start') == expected_right)
+        assert(binary_search_right(elements, needle, keys=starts) == expected_right)
+        assert(binary_search_right(starts, needle) == expected_right)
+        expected = expected_left if needle in starts else -1
+        assert(binary_search(elements, needle, key='start') == expected)
+        assert(binary_search(elements, needle, keys=starts) == expected)
+        assert(binary_search(starts, needle) == expected)
+
+
+def test_sort_inserted():
+    rng = random.Random(2)
+    elements = list[Interval]()
+    for i in range(0, 200):
+        elements.append(Interval(rng.randrange(0, 20), i))
+        sort_inserted(elements, len(elements) - 1, key='start')
+        # Elements with equal keys keep their insertion order
+        assert(elements == sorted(elements, key=lambda element: element.start))
+
+
+def test_insertionsort_key():
+    rng = random.Random(3)
+    elements = [ Interval(rng.randrange(0, 10), i) for i in range(0, 100) ]
+    expected = sorted(elements, key=lambda element: element.start)
+    insertionsort(elements, key='start')
+    assert(elements == expected)
+    values = [ rng.randrange(0, 100) for _ in range(0, 100) ]
+    expected = sorted(values, key=lambda value: -value)
+    insertionsort(values, key=lambda value: -value)
+    assert(values == expected)
+
+
+def test_adaptivesort():
+    rng = random.Random(4)
+    for n in [ 0, 1, 5, 16, 17, 200 ]:
+        elements = [ Interval(rng.randrange(0, 10), i) for i in range(0, n) ]
+        expected = sorted(elements, key=lambda element: element.start)
+        adaptivesort(elements, key='start')
+        assert(elements == expected)
+
+
+def test_sort_inserted_many():
+    rng = random.Random(5)
+    for n, m in [ (0, 10), (10, 0), (50, 50), (200, 3) ]:
+        head = sorted((Interval(rng.randrange(0, 20), i) for i in range(0, n)), key=lambda element: element.start)
+        tail = [ Interval(rng.randrange(0, 20), n + i) for i in range(0, m) ]
+        elements = head + tail
+        sort_inserted_many(elements, n, key='start')
+        assert(elements == sorted(head + tail, key=lambda element: element.start))
+    elements = [ 1, 2, 3, 4, 5 ]
+    sort_inserted_many(elements, 3)
+    assert(elements == [ 1, 2, 3, 4, 5 ])
+    elements = [ 3, 4, 5, 2, 1 ]
+    sort_inserted_many(elements, 3)
+    assert(elements == [ 1, 2, 3, 4, 5 ])
+
+
+def test_gallop():
+    rng = random.Random(6)
+    for n in [ 0, 1, 2, 7, 100 ]:
+        values = sorted(rng.randrange(0, 30) for _ in range(0, n))
+        elements = [ Interval(value, value + 1) for value in values ]
+        for needle in range(-1, 32):
+            left = binary_search_left(values, needle)
+            right = binary_search_right(values, needle)
+            for hint in range(-2, n + 3):
+                assert(gallop_left(values, needle, hint) == left)
+                assert(gallop_right(values, needle, hint) == right)
+                assert(gallop_left(elements, needle, hint, key='start') == left)
+                assert(gallop_right(elements, needle, hint, keys=values) == right)
+
+
+def test_search_sorted_many():
+    rng = random.Random(7)
+    values = sorted(rng.randrange(0, 1000) for _ in range(0, 500))
+    elements = [ Interval(value, value + 1) for value in values ]
+    for needles in [ sorted(rng.randrange(-10, 1010) for _ in range(0, 100)), [ rng.randrange(-10, 1010) for _ in range(0, 100) ], [] ]:
+        assert(search_sorted_many(values, needles) == [ binary_search_left(values, needle) for needle in needles ])
+        assert(search_sorted_many(values, needles, side='right') == [ binary_search_right(values, needle) for needle in needles ])
+        assert(search_sorted_many(elements, needles, key='start') == [ binary_search_left(values, needle) for needle in needles ])
+        assert(search_sorted_many(elements, needles, keys=values, side='right') == [ binary_search_right(values, needle) for needle in needles ])
+
+
+def test_search_sorted_many_steps():
+    calls = 0
+    def key(value: int) -> int:
+        nonlocal calls
+        calls += 1
+        return value
+    for e in [ 10, 12, 14, 16 ]:
+        n = 2 ** e
+        m = n // 8
+        values = list(range(0, n))
+        # Every needle lies just beyond twice the average distance from the previous result
+        needles = [ min(n - 1, i * (2 * n // m + 1)) for i in range(0, m) ]
+        calls = 0
+        assert(search_sorted_many(values, needles, key=key) == needles)
+        assert(calls <= 2 * m * math.log2(n / m))
+        needles = sorted(random.Random(e).randrange(0, n) for _ in range(0, m))
+        calls = 0
+        assert(search_sorted_many(values, needles, key=key) == needles)
+        assert(calls <= 2 * m * math.log2(n / m))
@@ -6,6 +6,8 @@ from scl.util import T
 
 class Node(Generic[T]):
 
+    __slots__ = ('value', 'parent')
+
     def __init__(self, value: T) -> None:
         super().__init__()
         self.value = value
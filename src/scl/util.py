@@ -1,6 +1,8 @@
 
+from bisect import bisect_left, bisect_right
 from collections.abc import Callable, Sequence
-from typing import Protocol, TypeVar, cast
+from operator import attrgetter
+from typing import Literal, Protocol, TypeVar, cast
 
 
 _Self = TypeVar('_Self', bound='Comparable')
@@ -28,8 +30,7 @@ def lift_key(arg: str | Callable[[_T], Comparable] | None) -> Callable[[_T], Com
     if arg is None:
         return lambda element: cast(Comparable, element)
     if isinstance(arg, str):
-        name = arg
-        return lambda element: getattr(element, name)
+        return attrgetter(arg)
     return arg
 
 
@@ -37,81 +38,191 @@ def sort_inserted(elements: list[_T], i: int, key: str | Callable[[_T], Comparab
     """
     Function that assumes a sorted list `elements` where a single element at index `i` is out of place.
     """
-    key = lift_key(key)
     x = elements[i]
-    x_key = key(x)
-    j = i
-    while j > 0 and key(elements[j-1]) > x_key:
-        elements[j] = elements[j-1]
-        j = j - 1
-    elements[j] = x
+    if key is None:
+        j = bisect_right(elements, x, 0, i)
+    else:
+        key = lift_key(key)
+        j = bisect_right(elements, key(x), 0, i, key=key)
+    if j < i:
+        del elements[i]
+        elements.insert(j, x)
+
+
+def sort_inserted_many(elements: list[_T], start: int, key: str | Callable[[_T], Comparable] | None = None) -> None:
+    """
+    Function that assumes a sorted list `elements` to which unsorted elements were appended from index `start` onwards.
+
+    The appended elements are sorted on their own and then merged with the
+    rest of the list, which takes O(n + m log m) for `m` appended elements.
+    """
+    if start >= len(elements):
+        return
+    key = lift_key(key) if key is not None else None
+    tail = elements[start:]
+    tail.sort(key=key)
+    elements[start:] = tail
+    if start > 0 and (elements[start-1] > tail[0] if key is None else key(elements[start-1]) > key(tail[0])): # type: ignore
+        # The list now consists of two sorted runs, which Timsort merges in linear time
+        elements.sort(key=key)
 
 
 def insertionsort(elements: list[_T], key: str | Callable[[_T], Comparable] | None = None) -> None:
     """
     Sort all elements of a list according to insertion sort.
     """
-    key = lift_key(key)
     i = 1
     n = len(elements)
     while i < n:
-        sort_inserted(elements, i)
+        sort_inserted(elements, i, key)
         i = i + 1
 
 
-def binary_search_left(elements: Sequence[_T], needle: Comparable, /, key: str | Callable[[_T], Comparable] | None = None) -> int:
+def adaptivesort(elements: list[_T], key: str | Callable[[_T], Comparable] | None = None) -> None:
+    """
+    Sort all elements of a list in a stable way, accepting the same `key` as the other helpers.
+
+    This delegates to Timsort, which already switches to binary insertion
+    sort for short runs and merges runs that are already sorted in linear
+    time. Running `insertionsort` on tiny lists instead is slower, because
+    it cannot do its comparisons in C.
+    """
+    elements.sort(key=lift_key(key) if key is not None else None)
+
+
+def binary_search_left(elements: Sequence[_T], needle: Comparable, /, key: str | Callable[[_T], Comparable] | None = None, keys: Sequence[Comparable] | None = None) -> int:
     """
     Get the index of the leftmost element for which the key is no smaller than `needle`.
+
+    If the keys of `elements` are already available, pass them in `keys` so
+    that `key` does not have to be called during the search.
     """
-    key = lift_key(key)
-    min = 0
-    max = len(elements)
-    while min < max:
-        i = (max + min) // 2
-        element = elements[i]
-        element_key = key(element)
-        if element_key < needle:
-            min = i+1
-        else:
-            max = i
-    return min
+    if keys is not None:
+        return bisect_left(keys, needle)
+    if key is None:
+        return bisect_left(elements, needle) # type: ignore
+    return bisect_left(elements, needle, key=lift_key(key))
 
 
-def binary_search_right(elements: Sequence[_T], needle: Comparable, /, key: str | Callable[[_T], Comparable] | None = None) -> int:
+def binary_search_right(elements: Sequence[_T], needle: Comparable, /, key: str | Callable[[_T], Comparable] | None = None, keys: Sequence[Comparable] | None = None) -> int:
     """
     Get the index of the rightmost element for which the key is no larger than `needle`.
+
+    If the keys of `elements` are already available, pass them in `keys` so
+    that `key` does not have to be called during the search.
     """
-    key = lift_key(key)
-    min = 0
-    max = len(elements)
-    while min < max:
-        i = (max + min) // 2
-        element = elements[i]
-        element_key = key(element)
-        if element_key > needle:
-            max = i
-        else:
-            min = i+1
-    return max
+    if keys is not None:
+        return bisect_right(keys, needle)
+    if key is None:
+        return bisect_right(elements, needle) # type: ignore
+    return bisect_right(elements, needle, key=lift_key(key))
 
 
-def binary_search(elements: Sequence[_T], needle: Comparable, /, key: str | Callable[[_T], Comparable] | None = None) -> int:
+def binary_search(elements: Sequence[_T], needle: Comparable, /, key: str | Callable[[_T], Comparable] | None = None, keys: Sequence[Comparable] | None = None) -> int:
     """
     Get the index of the element that exactly matches keys with `needle`.
+
+    Returns the leftmost such index, or `-1` if there is no such element.
     """
+    if keys is not None:
+        i = bisect_left(keys, needle)
+        return i if i < len(keys) and keys[i] == needle else -1
+    if key is None:
+        i = bisect_left(elements, needle) # type: ignore
+        return i if i < len(elements) and elements[i] == needle else -1
     key = lift_key(key)
-    min = 0
-    max = len(elements)
-    while min < max:
-        i = (max + min) // 2
-        element = elements[i]
-        element_key = key(element)
-        if element_key > needle:
-            max = i
-        elif element_key < needle:
-            min = i+1
-        else:
-            return i
-    return -1
+    i = bisect_left(elements, needle, key=key)
+    return i if i < len(elements) and key(elements[i]) == needle else -1
+
+
+def _gallop_forward(elements: Sequence[_T], needle: Comparable, lo: int, key: Callable[[_T], Comparable] | None, right: bool, step: int) -> int:
+    # The result is known to be at least `lo`. Probe the elements at
+    # `lo + step - 1`, `lo + 3 * step - 1`, ... until one of them lies
+    # beyond the result and only bisect the range between the last two.
+    n = len(elements)
+    search = bisect_right if right else bisect_left
+    offset = step
+    while lo + offset <= n:
+        i = lo + offset - 1
+        element_key = key(elements[i]) if key is not None else elements[i]
+        if element_key > needle if right else element_key >= needle: # type: ignore
+            return search(elements, needle, lo, i, key=key) # type: ignore
+        lo = i + 1
+        offset *= 2
+    return search(elements, needle, lo, n, key=key) # type: ignore
+
+
+def _gallop(elements: Sequence[_T], needle: Comparable, hint: int, key: Callable[[_T], Comparable] | None, right: bool) -> int:
+    n = len(elements)
+    if hint < 0:
+        hint = 0
+    elif hint > n:
+        hint = n
+    search = bisect_right if right else bisect_left
+    def before(i: int) -> bool:
+        # Whether the answer lies beyond index `i`
+        element_key = key(elements[i]) if key is not None else elements[i]
+        return element_key <= needle if right else element_key < needle # type: ignore
+    if hint < n and before(hint):
+        # Search to the right of the hint with steps of 1, 2, 4, ...
+        return _gallop_forward(elements, needle, hint + 1, key, right, 1)
+    # Search to the left of the hint with steps of 1, 2, 4, ...
+    hi = hint
+    offset = 1
+    while hint - offset >= 0 and not before(hint - offset):
+        hi = hint - offset
+        offset *= 2
+    return search(elements, needle, max(0, hint - offset + 1), hi, key=key) # type: ignore
+
+
+def gallop_left(elements: Sequence[_T], needle: Comparable, hint: int, /, key: str | Callable[[_T], Comparable] | None = None, keys: Sequence[Comparable] | None = None) -> int:
+    """
+    Like `binary_search_left`, but start searching around the index `hint`.
+
+    The search takes O(log d) steps, where `d` is the distance between
+    `hint` and the result, which is much faster than a binary search over
+    the entire list when the result is expected to be close to `hint`.
+    """
+    if keys is not None:
+        return _gallop(keys, needle, hint, None, False)
+    return _gallop(elements, needle, hint, lift_key(key) if key is not None else None, False)
 
 
+def gallop_right(elements: Sequence[_T], needle: Comparable, hint: int, /, key: str | Callable[[_T], Comparable] | None = None, keys: Sequence[Comparable] | None = None) -> int:
+    """
+    Like `binary_search_right`, but start searching around the index `hint`.
+    """
+    if keys is not None:
+        return _gallop(keys, needle, hint, None, True)
+    return _gallop(elements, needle, hint, lift_key(key) if key is not None else None, True)
+
+
+def search_sorted_many(elements: Sequence[_T], needles: Sequence[Comparable], /, key: str | Callable[[_T], Comparable] | None = None, keys: Sequence[Comparable] | None = None, side: Literal['left', 'right'] = 'left') -> list[int]:
+    """
+    Perform `binary_search_left` or `binary_search_right`, depending on `side`, for every needle.
+
+    The needles are visited in sorted order and every search gallops
+    forward from the result of the previous one, with steps that start at
+    the average distance between two results and double until the result
+    is passed. Only the range that was found is then bisected, in C. This
+    way `m` needles are found in O(m log(n/m)) steps instead of O(m log n).
+    """
+    if keys is not None:
+        elements = keys # type: ignore
+        lifted = None
+    else:
+        lifted = lift_key(key) if key is not None else None
+    right = side == 'right'
+    n = len(elements)
+    m = len(needles)
+    if all(needles[i] <= needles[i+1] for i in range(0, m - 1)):
+        order: Sequence[int] = range(0, m)
+    else:
+        order = sorted(range(0, m), key=needles.__getitem__)
+    step = max(1, n // max(1, m))
+    result = [ 0 ] * m
+    hint = 0
+    for i in order:
+        hint = _gallop_forward(elements, needles[i], hint, lifted, right, step)
+        result[i] = hint
+    return result